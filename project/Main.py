@@ -1,41 +1,202 @@
 """
 Main launcher
 Choose function to run
+
+Without arguments an interactive menu is shown, otherwise
+the command line picks the action (python project/Main.py -h),
+e.g. for scheduled runs:
+
+    python project/Main.py pipeline fetch analyze backtest summary --workers 4
+
+Modules are imported inside each action, so an action
+only pays for the libraries it uses. Option flags are
+applied to config before anything else is imported.
 """
-from config import symbols
-from modules.runner import (
-    run_predictor, 
-    run_backtests, 
-    prepare_analysis,
-    export_all_trades, 
-    get_all_historical_data,
-    profit_summary)
+import argparse
+import sys
+import time
 
-if __name__ == "__main__":
+import config
+
+def run_predictor(args):
+    from modules.runner import run_predictor
+    run_predictor()
+
+def run_backtests(args):
+    from modules.runner import run_backtests
+    run_backtests()
+
+def prepare_analysis(args):
+    from modules.runner import prepare_analysis
+    prepare_analysis()
+
+def export_all_trades(args):
+    from modules.runner import export_all_trades
+    export_all_trades()
+
+def get_all_historical_data(args):
+    from modules.runner import get_all_historical_data
+    get_all_historical_data()
+
+def profit_summary(args):
+    from modules.runner import profit_summary
+    profit_summary()
+
+def run_backtest_pipeline(args):
+    from modules.runner import run_backtest_pipeline
+    run_backtest_pipeline()
+
+def convert_data_tree(args):
+    from modules.storage import convert_data_tree
+    convert_data_tree()
+
+def run_sweep(args):
+    from modules.sweep import run_sweep
+    print(run_sweep().groupby("Symbol").head(3).to_string(index = False))
+
+def build_price_store(args):
+    from modules.price_store import build_price_store
+    build_price_store()
+
+def run_portfolio_backtest(args):
+    from modules.portfolio import run_portfolio_backtest
+    run_portfolio_backtest()
+
+def run_walk_forward(args):
+    from modules.walk_forward import run_walk_forward
+    report, equity = run_walk_forward()
+    print(report.to_string(index = False))
+    print(equity[equity["Symbol"] == "Portfolio"].to_string(index = False))
+
+def run_monte_carlo(args):
+    from modules.monte_carlo import run_monte_carlo
+    print(run_monte_carlo().to_string(index = False))
+
+def catch_up_live_bars(args):
+    from modules.bars import catch_up_live_bars
+    print(f"{catch_up_live_bars()} closed bars written")
+
+def run_pipeline(args):
+    from modules.pipeline import run_pipeline
+    run_pipeline(args.stages)
+
+def profile_imports(args):
+    from modules.import_profile import import_report
+    packages, total = import_report(args.modules)
+    print(packages.to_string(index = False, float_format = "{:.1f}".format))
+    print(f"Total: {total:.0f}ms")
+
+# (command, menu label, action), menu numbers follow this order
+ACTIONS = [
+    ("predict", "Run Predictor", run_predictor),
+    ("backtest", "Run Backtests", run_backtests),
+    ("analyze", "Prepare Analysis", prepare_analysis),
+    ("export", "Export All Trades", export_all_trades),
+    ("fetch", "Get Historical Data", get_all_historical_data),
+    ("summary", "Show Profit Summary", profit_summary),
+    ("backtest-pipeline", "Run Backtest Pipeline (2, 4 and 6 in one pass)", run_backtest_pipeline),
+    ("convert", "Convert Data to Storage Format", convert_data_tree),
+    ("sweep", "Run Parameter Sweep", run_sweep),
+    ("store", "Build Price Store", build_price_store),
+    ("portfolio", "Run Portfolio Backtest", run_portfolio_backtest),
+    ("walk-forward", "Run Walk-Forward Optimisation", run_walk_forward),
+    ("monte-carlo", "Run Monte Carlo Robustness Check", run_monte_carlo),
+    ("bars", "Build Live Bars from Tick Store", catch_up_live_bars),
+]
+
+PIPELINE_STAGES = ["fetch", "analyze", "backtest", "summary"]
+
+def option_parser(default = None):
+    """
+    Flags shared by every command. Command parsers use
+    SUPPRESS so they keep values given before the command.
+    """
+    options = argparse.ArgumentParser(add_help = False, argument_default = default)
+    options.add_argument("--symbols", metavar = "SYMBOLS",
+                         help = "comma separated symbols to run, default logs/symbols.txt")
+    options.add_argument("--interval", choices = ["1h", "1d"], help = "bar interval")
+    options.add_argument("--workers", type = int, help = "worker threads / processes for every stage")
+    options.add_argument("--engine", choices = ["loop", "vectorized"], help = "backtest engine")
+    options.add_argument("--format", choices = ["csv", "parquet", "feather"],
+                         help = "storage format of the data files")
+
+    return options
+
+def build_parser():
+    options = option_parser(argparse.SUPPRESS)
+
+    parser = argparse.ArgumentParser(prog = "Main.py", parents = [option_parser()],
+                                     description = "Stock predictor actions, "
+                                                   "no command shows the interactive menu.")
+    commands = parser.add_subparsers(dest = "command", metavar = "command")
+
+    for command, label, action in ACTIONS:
+        commands.add_parser(command, parents = [options], help = label).set_defaults(action = action)
+
+    pipeline = commands.add_parser("pipeline", parents = [options],
+                                   help = "Chain stages in one process, data passed in memory")
+    pipeline.add_argument("stages", nargs = "+", choices = PIPELINE_STAGES, metavar = "stage",
+                          help = f"stages to run in order: {', '.join(PIPELINE_STAGES)}")
+    pipeline.set_defaults(action = run_pipeline)
+
+    imports = commands.add_parser("imports", parents = [options],
+                                  help = "Import-time profile per package")
+    imports.add_argument("modules", nargs = "*", default = ["modules.runner"],
+                         help = "modules to import (default modules.runner)")
+    imports.set_defaults(action = profile_imports)
+
+    return parser
+
+def apply_options(args):
+    """
+    Overrides config values with the given flags
+    (before the action imports the modules that read them).
+    """
+    if args.symbols:
+        config.symbols = [symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()]
+
+    if args.interval:
+        config.interval = args.interval
+
+    if args.workers is not None:
+        config.backtest_workers = config.history_workers = args.workers
+        config.sweep_workers = config.walk_forward_workers = args.workers
+
+    if args.engine:
+        config.backtest_engine = args.engine
+
+    if args.format:
+        config.storage_format = args.format
+
+def run_menu():
     print("Select an action to run:")
-    print("1. Run Predictor")
-    print("2. Run Backtests")
-    print("3. Prepare Analysis")
-    print("4. Export All Trades")
-    print("5. Get Historical Data")
-    print("6. Show Profit Summary")
-
-    choice = input("Enter 1 to 6: ")
-
-    if choice == "1":
-        run_predictor()
-    elif choice == "2":
-        run_backtests()
-    elif choice == "3":
-        prepare_analysis()
-    elif choice == "4":
-        export_all_trades()
-    elif choice == "5":
-        get_all_historical_data()
-    elif choice == "6":
-        profit_summary()
-    #elif choice == "7":
-        #
+    for number, (_, label, _) in enumerate(ACTIONS, start = 1):
+        print(f"{number}. {label}")
+
+    choice = input(f"Enter 1 to {len(ACTIONS)}: ")
+
+    if choice.isdigit() and 1 <= int(choice) <= len(ACTIONS):
+        ACTIONS[int(choice) - 1][2](None)
     else:
         print("Invalid choice.")
 
+def main(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.error("a command is required when options are given")
+
+    apply_options(args)
+
+    start = time.perf_counter()
+    args.action(args)
+
+    if args.command != "pipeline":
+        print(f"{args.command} finished in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        run_menu()
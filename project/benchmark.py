@@ -0,0 +1,731 @@
+"""
+Benchmarks and parity checks
+Run from the repository root: python project/benchmark.py [name ...]
+Exits with status 1 when any check printed FAILED. The
+parity checks also run as tests: python -m pytest tests
+"""
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+from config import wallet_balance, symbols, risk_per_trade
+
+failed_checks = []
+
+def check(ok):
+    """
+    "OK" or "FAILED" for a check, failures set the exit status.
+    """
+    if not ok:
+        failed_checks.append(ok)
+
+    return "OK" if ok else "FAILED"
+
+def timed(func, *args, **kwargs):
+    """
+    Runs func once and returns (result, seconds).
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_backtest_engines():
+    """
+    Runs the loop and vectorized backtest engines on every
+    analysis CSV in data/Analysis_Hourly, checks that both
+    return the same results and trade_log (records and frame),
+    and prints timings.
+    """
+    from modules.backtest import backtest_signals
+    from modules.trade_store import TRADE_LOG_COLUMNS
+
+    per_stock_balance = wallet_balance / len(symbols)
+    mismatches = 0
+
+    for path in sorted(glob.glob("project/data/Analysis_Hourly/analysis-*.csv")):
+        df = pd.read_csv(path)
+
+        (loop_results, loop_log), loop_time = timed(
+            backtest_signals, df, per_stock_balance, engine = "loop")
+        (vec_results, vec_log), vec_time = timed(
+            backtest_signals, df, per_stock_balance, engine = "vectorized")
+
+        (_, vec_frame) = backtest_signals(df, per_stock_balance, engine = "vectorized",
+                                          log_format = "frame")
+        loop_frame = pd.DataFrame(loop_log, columns = TRADE_LOG_COLUMNS)
+
+        same = (loop_results == vec_results and loop_log == vec_log 
+                and vec_frame.equals(loop_frame))
+        mismatches += not same
+
+        print(f"{path}: loop {loop_time:.3f}s, vectorized {vec_time:.3f}s, "
+              f"speedup {loop_time / vec_time:.1f}x, parity {check(same)}")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} file(s) differ between engines")
+
+def bench_equity_curves():
+    """
+    Vectorized backtest with and without equity curves on the 
+    analysis CSVs, checks the curve ends at the final balance
+    and matches a bar-by-bar mark-to-market replay.
+    """
+    import numpy as np
+    from modules.backtest import backtest_signals, find_trades
+
+    per_stock_balance = wallet_balance / len(symbols)
+
+    for path in sorted(glob.glob("project/data/Analysis_Hourly/analysis-*.csv")):
+        df = pd.read_csv(path)
+        curves = {}
+
+        _, plain_time = timed(backtest_signals, df, per_stock_balance, engine = "vectorized")
+        (results, _), curves_time = timed(
+            backtest_signals, df, per_stock_balance, engine = "vectorized", curves = curves)
+
+        prices = df["Price"].to_numpy(dtype = float)
+        entries, exits, sides, _ = find_trades(prices, df["Position"].to_numpy())
+        balances = np.concatenate(([per_stock_balance], curves["Balance"]))
+
+        replay = balances[np.searchsorted(exits, np.arange(len(prices)), side = "right")]
+        for i, (entry, exit, side) in enumerate(zip(entries, exits, sides)):
+            quantity = balances[i] * risk_per_trade / prices[entry]
+            replay[entry:exit] += side * quantity * (prices[entry:exit] - prices[entry])
+
+        same = np.allclose(replay, curves["Equity"]) and (
+            len(curves["Balance"]) == 0 or curves["Equity"][-1] == curves["Balance"][-1])
+
+        print(f"{path}: without curves {plain_time * 1000:.1f}ms, with curves "
+              f"{curves_time * 1000:.1f}ms, max drawdown {results['Max Drawdown']:.1f}%, "
+              f"replay {check(same)}")
+
+def bench_trade_store(trades = 1_000_000):
+    """
+    Memory and time of recording synthetic trades as 
+    dicts + win/loss lists (close helpers) vs the TradeStore.
+    """
+    import tracemalloc
+    import numpy as np
+    from modules.trade_store import TradeStore
+
+    rng = np.random.default_rng(0)
+    entry_prices = (100 + rng.normal(0, 5, trades)).tolist()
+    exit_prices = (100 + rng.normal(0, 5, trades)).tolist()
+    profits = rng.normal(0, 1, trades).tolist()
+    sides = rng.choice([-1, 1], trades).tolist()
+
+    def dict_log():
+        trade_log, win_profit, loss_profit = [], [], []
+        balance = 1000.0
+        for i in range(trades):
+            balance += profits[i]
+            if profits[i] > 0:
+                win_profit.append(profits[i])
+            if profits[i] < 0:
+                loss_profit.append(profits[i])
+            trade_log.append({
+                "Symbol": "SYM", "Entry Price": entry_prices[i], "Entry Time": i,
+                "Exit Time": i + 1, "Exit Price": exit_prices[i], "Closed Position": sides[i],
+                "Profit": round(profits[i], 2), "Balance": round(balance, 2)})
+        return trade_log, win_profit, loss_profit
+
+    def trade_store():
+        store = TradeStore()
+        symbol_id = store.symbol_id("SYM")
+        balance = 1000.0
+        for i in range(trades):
+            balance += profits[i]
+            store.add(symbol_id, i, i + 1, entry_prices[i], exit_prices[i], sides[i],
+                      1.0, profits[i], balance)
+        return store
+
+    for name, func in (("dicts + lists", dict_log), ("TradeStore", trade_store)):
+        tracemalloc.start()
+        result, seconds = timed(func)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name}: {trades} trades, {current / 2**20:.1f} MB held "
+              f"(peak {peak / 2**20:.1f} MB), {seconds:.2f}s")
+
+    store = result
+    frame, seconds = timed(store.to_frame)
+    shared = all(np.shares_memory(frame[name].to_numpy(), store.data) for name in frame.columns)
+    print(f"to_frame: {seconds * 1000:.2f}ms, zero copy {check(shared)}")
+
+def bench_result_cache():
+    """
+    Cold vs warm backtest_all_symbols through the result 
+    cache (temporary cache folder), checks both return
+    the same outputs as an uncached run.
+    """
+    import tempfile
+    import modules.result_cache as result_cache
+    from modules.runner import backtest_all_symbols
+
+    expected = backtest_all_symbols(write_trades = False, use_cache = False)
+
+    with tempfile.TemporaryDirectory() as folder:
+        # get_result_cache returns the temporary cache
+        result_cache._result_cache = result_cache.ResultCache(path = folder)
+
+        cold, cold_time = timed(backtest_all_symbols, write_trades = False)
+        warm, warm_time = timed(backtest_all_symbols, write_trades = False)
+
+        result_cache._result_cache = None
+
+    def same_outputs(outputs, other):
+        return all(symbol == other_symbol and results == other_results and trades.equals(other_trades)
+                   for (symbol, results, trades), (other_symbol, other_results, other_trades)
+                   in zip(outputs, other))
+
+    same = same_outputs(expected, cold) and same_outputs(expected, warm)
+    print(f"{len(symbols)} symbols: cold {cold_time * 1000:.1f}ms, warm {warm_time * 1000:.1f}ms, "
+          f"same outputs {check(same)}")
+
+def bench_logging(lines = 100000):
+    """
+    save_price-style lines appended with open/append/close per
+    line vs queued on the LogWriter, checks load_prices parses
+    every line of both files.
+    """
+    import tempfile
+    from datetime import datetime
+    from modules.log_writer import LogWriter
+    from modules.utils import load_prices
+
+    with tempfile.TemporaryDirectory() as folder:
+        sync_path = os.path.join(folder, "sync.txt")
+        async_path = os.path.join(folder, "async.txt")
+
+        def per_line():
+            for i in range(lines):
+                with open(sync_path, "a") as file:
+                    file.write(f"[{datetime.now()}] SYM{i % 100} price: {100 + i % 7} \n")
+
+        def queued():
+            writer = LogWriter(max_bytes = 0)
+            for i in range(lines):
+                writer.write(async_path, f"[{datetime.now()}] SYM{i % 100} price: {100 + i % 7} \n")
+            return writer
+
+        _, sync_time = timed(per_line)
+        writer, queue_time = timed(queued)
+        _, close_time = timed(writer.close)
+
+        parsed = len(load_prices(sync_path)) == len(load_prices(async_path)) == lines
+        print(f"{lines} lines: open per line {sync_time:.2f}s, queued {queue_time:.2f}s "
+              f"(+{close_time:.2f}s final flush), load_prices {check(parsed)}")
+
+def bench_price_log(sizes = (1_000_000, 10_000_000)):
+    """
+    Parses synthetic prices.txt logs with the line loop, the
+    chunked regex loader and the binary tick store.
+    """
+    import tempfile
+    import numpy as np
+    from modules.utils import load_prices, load_prices_loop
+    from modules.tick_store import import_price_log, read_ticks
+
+    with tempfile.TemporaryDirectory() as folder:
+        for lines in sizes:
+            text_path = os.path.join(folder, f"prices-{lines}.txt")
+            store_path = os.path.join(folder, f"ticks-{lines}.bin")
+
+            times = pd.Timestamp("2025-06-02 22:32:09.194275") + pd.to_timedelta(
+                np.arange(lines) * 10, unit = "s")
+            ticks = pd.DataFrame({"Time": times.astype(str), 
+                                  "Symbol": np.array(symbols)[np.arange(lines) % len(symbols)],
+                                  "Price": np.round(100 + np.arange(lines) % 5000 / 100, 4)})
+            with open(text_path, "w") as file:
+                file.writelines("[" + ticks["Time"] + "] " + ticks["Symbol"] + " price: " 
+                                + ticks["Price"].map("{:.4f}".format) + " \n")
+
+            loop_prices, loop_time = timed(load_prices_loop, text_path)
+            prices, regex_time = timed(load_prices, text_path)
+            _, import_time = timed(import_price_log, text_path, store_path)
+            tick_frame, tick_time = timed(read_ticks, store_path)
+
+            same = loop_prices.equals(prices) and len(tick_frame) == lines and \
+                np.array_equal(tick_frame["Price"].to_numpy(), prices["Price"].to_numpy())
+            size = os.path.getsize(text_path) / 2**20
+            tick_size = os.path.getsize(store_path) / 2**20
+
+            print(f"{lines} lines ({size:.0f} MB text, {tick_size:.0f} MB ticks): "
+                  f"loop {loop_time:.2f}s, vectorized {regex_time:.2f}s "
+                  f"({loop_time / regex_time:.1f}x), tick store read {tick_time:.3f}s "
+                  f"(import {import_time:.2f}s), parity {check(same)}")
+
+            del loop_prices, prices, tick_frame
+
+def load_signals(folder):
+    """
+    Loads every historical CSV in data/{folder} with 
+    MA10/MA50 signals added, ready for add_position.
+    """
+    from modules.indicators import add_ma
+    from modules.strategy import generate_signals
+
+    frames = {}
+
+    for path in sorted(glob.glob(f"project/data/{folder}/historical_prices-*.csv")):
+        df = pd.read_csv(path)
+        df = add_ma(df, 10)
+        df = add_ma(df, 50)
+        frames[path] = generate_signals(df)
+
+    return frames
+
+def bench_add_position():
+    """
+    Compares the vectorized position rules against the original
+    iterrows loop on the hourly and daily datasets.
+    """
+    from modules.strategy import (add_position, add_position_loop, carry_forward, 
+        flat_on_zero, hold_n_bars, cooldown_after_exit)
+
+    rules = {
+        "carry_forward": (carry_forward, {}),
+        "flat_on_zero": (flat_on_zero, {}),
+        "hold_n_bars": (hold_n_bars, {"bars": 5}),
+        "cooldown_after_exit": (cooldown_after_exit, {"bars": 5}),
+    }
+
+    for folder in ("Hourly", "Daily"):
+        frames = load_signals(folder)
+        rows = sum(len(df) for df in frames.values())
+
+        loop_positions, loop_time = timed(
+            lambda: [add_position_loop(df.copy())["Position"] for df in frames.values()])
+        print(f"{folder} ({len(frames)} files, {rows} rows): loop {loop_time:.3f}s")
+
+        for name, (rule, kwargs) in rules.items():
+            positions, rule_time = timed(
+                lambda: [add_position(df.copy(), rule, **kwargs)["Position"] for df in frames.values()])
+            
+            line = f"  {name}: {rule_time:.3f}s ({loop_time / rule_time:.0f}x)"
+            if rule is carry_forward:
+                same = all(a.equals(b) for a, b in zip(loop_positions, positions))
+                line += f", parity {check(same)}"
+            
+            if rule is hold_n_bars:
+                expected = [hold_n_bars_loop(df["Signal"], kwargs["bars"]) for df in frames.values()]
+                same = all(list(a) == b for a, b in zip(positions, expected))
+                flat = sum(int(((a == 0) & (b != 0)).sum()) for a, b in zip(positions, loop_positions))
+                line += f", {flat} bars flattened, parity {check(same and flat)}"
+            print(line)
+
+def hold_n_bars_loop(signal, bars):
+    """
+    Row by row hold_n_bars reference: a position is held for
+    bars bars from the bar it was entered on.
+    """
+    carried, held, positions = 0, 0, []
+
+    for value in signal.tolist():
+        if value != 0 and value != carried:
+            carried, held = value, 0
+        
+        positions.append(carried if held < bars else 0)
+        held += 1
+
+    return positions
+
+def bench_storage():
+    """
+    Write / full read / projected read timings for CSV, Parquet
+    and Feather on the daily historical files (CSV timestamps 
+    are parsed with pd.to_datetime to match the binary formats).
+    """
+    import tempfile
+    from modules.storage import write_frame, read_frame
+
+    frames = {path: pd.read_csv(path) 
+              for path in sorted(glob.glob("project/data/Daily/historical_prices-*.csv"))}
+    columns = ["Timestamp", "Symbol", "Price"]
+
+    with tempfile.TemporaryDirectory() as folder:
+        for fmt in ("csv", "parquet", "feather"):
+            paths = {path: os.path.join(folder, os.path.basename(path)) for path in frames}
+
+            _, write_time = timed(lambda: [write_frame(df, paths[path], fmt) 
+                                           for path, df in frames.items()])
+            
+            def read_all(cols):
+                for path in paths.values():
+                    df = read_frame(path, columns = cols, fmt = fmt)
+                    if not pd.api.types.is_datetime64_any_dtype(df["Timestamp"]):
+                        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+
+            _, read_time = timed(read_all, None)
+            _, projected_time = timed(read_all, columns)
+
+            print(f"{fmt}: write {write_time:.3f}s, read {read_time:.3f}s, "
+                  f"read {len(columns)} columns {projected_time:.3f}s")
+
+def start_quote_stub(delay = 0.2):
+    """
+    Starts a local HTTP server answering like the Alpha Vantage 
+    GLOBAL_QUOTE endpoint after delay seconds.
+    Returns (server, url).
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    class QuoteHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            symbol = query.get("symbol", [""])[0]
+            time.sleep(delay)
+
+            body = json.dumps({"Global Quote": {"01. symbol": symbol, "05. price": "123.4500"}})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuoteHandler)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+
+    return server, f"http://127.0.0.1:{server.server_address[1]}/query"
+
+def bench_quotes():
+    """
+    Sequential get_price + sleep_time (old run_predictor loop)
+    against concurrent get_prices, on a local GLOBAL_QUOTE stub.
+    """
+    from modules.price_fetcher import get_price, get_prices, TokenBucket
+    from config import sleep_time
+
+    server, url = start_quote_stub()
+    stub_symbols = [f"SYM{i}" for i in range(20)]
+
+    def sequential():
+        prices = {}
+        for symbol in stub_symbols:
+            prices[symbol] = get_price(symbol, url = url, api_key = "stub")
+            time.sleep(sleep_time)
+        return prices
+
+    sequential_prices, sequential_time = timed(sequential)
+    concurrent_prices, concurrent_time = timed(
+        get_prices, stub_symbols, workers = 5, limiter = TokenBucket(50, 5), url = url,
+        api_key = "stub")
+    
+    print(f"{len(stub_symbols)} symbols: sequential {sequential_time:.2f}s, "
+          f"concurrent (50 req/s) {concurrent_time:.2f}s, "
+          f"same prices {check(sequential_prices == concurrent_prices)}")
+
+    bench_quote_cache(url, stub_symbols)
+    server.shutdown()
+
+def bench_quote_cache(url, stub_symbols):
+    """
+    Repeated predictor-style reads through the cached provider.
+    """
+    from modules.price_fetcher import (AlphaVantageProvider, CachedQuoteProvider, 
+        QuoteCache, TokenBucket)
+
+    provider = CachedQuoteProvider(
+        AlphaVantageProvider(batch = False, limiter = TokenBucket(50, 5), url = url, api_key = "stub"), 
+        QuoteCache(ttl = 60, path = None))
+
+    _, cold_time = timed(provider.get_quotes, stub_symbols)
+    _, warm_time = timed(provider.get_quotes, stub_symbols)
+    
+    stats = provider.cache.stats()
+    print(f"cached provider: cold {cold_time:.2f}s, warm {warm_time:.4f}s, "
+          f"{stats['Hits']} hits / {stats['Misses']} misses")
+
+def bench_rolling_means():
+    """
+    Batched rolling_means against repeated add_ma calls 
+    for MA2..MA200 on the daily files.
+    """
+    import warnings
+    import numpy as np
+    from modules.indicators import add_ma, rolling_means
+
+    windows = list(range(2, 201))
+    frames = [pd.read_csv(path) 
+              for path in sorted(glob.glob("project/data/Daily/historical_prices-*.csv"))]
+
+    def repeated():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+            return [[add_ma(df, window)[f"MA{window}"].to_numpy() for window in windows] 
+                    for df in (frame[["Price"]].copy() for frame in frames)]
+
+    def batched():
+        return [rolling_means(df["Price"].to_numpy(), windows) for df in frames]
+
+    expected, repeated_time = timed(repeated)
+    actual, batched_time = timed(batched)
+
+    same_nans = all(np.array_equal(np.isnan(np.array(a)), np.isnan(b)) 
+                    for a, b in zip(expected, actual))
+    max_error = max(np.nanmax(np.abs((np.array(a) - b) / np.array(a))) 
+                    for a, b in zip(expected, actual))
+
+    print(f"{len(windows)} windows x {len(frames)} files: add_ma {repeated_time:.3f}s, "
+          f"rolling_means {batched_time:.3f}s ({repeated_time / batched_time:.0f}x), "
+          f"NaN warm-up {check(same_nans)}, max relative error {max_error:.1e}")
+
+STORE_RUN = """
+import resource, time
+from config import symbols
+from modules.runner import load_historical, add_analysis_columns
+from modules.price_fetcher import historical_path
+from modules.backtest import backtest_signals
+from modules.price_store import PriceStore, backtest_store_symbol
+
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+
+# SCALE copies of the universe stand in for a larger symbol list
+if MODE == "files":
+    frames = [add_analysis_columns(load_historical(historical_path(symbol)))
+              for copy in range(SCALE) for symbol in symbols]
+    for df in frames:
+        backtest_signals(df, 100, engine = "vectorized")
+else:
+    store = PriceStore(STORE)
+    for copy in range(SCALE):
+        for symbol in store.symbols:
+            backtest_store_symbol(symbol, 100, store)
+
+seconds = time.perf_counter() - start
+print(base_rss, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, seconds)
+"""
+
+def bench_price_store(scale = 20):
+    """
+    Peak RSS and time of a full-universe strategy + backtest run
+    (universe repeated scale times), holding per-symbol DataFrames 
+    built from the historical files vs reading the memory-mapped 
+    price store, each in a fresh process.
+    """
+    import subprocess
+    import tempfile
+    from modules.price_store import build_price_store
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, ["project", env.get("PYTHONPATH")]))
+
+    with tempfile.TemporaryDirectory() as folder:
+        build_price_store(path = folder)
+
+        for mode in ("files", "store"):
+            code = f"MODE = {mode!r}\nSTORE = {folder!r}\nSCALE = {scale}\n" + STORE_RUN
+            output = subprocess.run([sys.executable, "-c", code], env = env,
+                                    capture_output = True, text = True, check = True).stdout
+            base_rss, max_rss, seconds = output.split()
+            base_rss, max_rss = int(base_rss) / 1024, int(max_rss) / 1024
+            
+            print(f"{mode}: peak RSS {max_rss:.1f} MB "
+                  f"(+{max_rss - base_rss:.1f} MB over imports), {float(seconds):.2f}s")
+
+def bench_streaming():
+    """
+    Replays every historical file tick by tick through
+    StreamingStrategy and checks the analysis columns match
+    the batch add_analysis_columns output exactly.
+    """
+    import numpy as np
+    from modules.runner import load_historical, add_analysis_columns
+    from modules.strategy import StreamingStrategy
+
+    mismatches = 0
+
+    for path in sorted(glob.glob("project/data/*/historical_prices-*.csv")):
+        df, batch_time = timed(add_analysis_columns, load_historical(path))
+
+        strategy = StreamingStrategy()
+        rows, stream_time = timed(lambda: [strategy.update(price) for price in df["Price"].tolist()])
+        rows = pd.DataFrame(rows)
+
+        same = all(np.array_equal(df[column].to_numpy(dtype = float),
+                                  rows[column].to_numpy(dtype = float), equal_nan = True)
+                   for column in rows.columns)
+        mismatches += not same
+
+        print(f"{path}: batch {batch_time:.3f}s, streaming {stream_time:.3f}s "
+              f"({stream_time / len(df) * 1e6:.1f}us per tick), parity {check(same)}")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} file(s) differ between batch and streaming")
+
+def bench_monte_carlo(simulations = 100000):
+    """
+    Monte Carlo run (per symbol and portfolio) on the combined 
+    trade log for both methods, checks a fixed seed repeats.
+    """
+    from modules.monte_carlo import run_monte_carlo
+    from config import trade_log_path
+
+    df = pd.read_csv(trade_log_path)
+
+    for method in ("bootstrap", "shuffle"):
+        summary, seconds = timed(run_monte_carlo, df, simulations, method, save = False)
+        repeat = run_monte_carlo(df, 1000, method, save = False).equals(
+            run_monte_carlo(df, 1000, method, save = False))
+
+        print(f"{method}: {simulations} simulations x {len(summary)} series "
+              f"({len(df)} trades) {seconds:.2f}s, seeded repeat {check(repeat)}")
+
+def bench_bars(ticks = 1_000_000):
+    """
+    Folds synthetic ticks into bars tick by tick (add), in one
+    batch (add_many) and through a chunked tick store catch-up,
+    checks all three match a pandas resample of the same ticks
+    (offset by live_bar_offsets). Replaying the tick store without
+    its state file must not write any bar twice.
+    """
+    import tempfile
+    import numpy as np
+    from modules.bars import BarAggregator, update_live_bars, tick_times_utc, bars_dir
+    from modules.tick_store import TickStore
+    from config import interval, live_bars_path, live_bar_offsets
+
+    rng = np.random.default_rng(0)
+    names = np.array(symbols)[rng.integers(0, len(symbols), ticks)]
+    timestamps = pd.Timestamp("2025-06-02 13:30").value + np.cumsum(
+        rng.integers(0, 2 * 10**9, ticks))
+    prices = np.round(100 + np.cumsum(rng.normal(0, 0.05, ticks)), 4)
+
+    def reference(times):
+        frame = pd.DataFrame({"Symbol": names, "Price": prices},
+                             index = pd.to_datetime(times).rename("Start"))
+        bars = frame.groupby("Symbol")["Price"].resample(
+            interval.replace("m", "min"), offset = f"{live_bar_offsets.get(interval, 0)}min").ohlc()
+        bars = bars.dropna().reset_index()
+        # the last bar of each symbol is still open
+        return bars[bars.duplicated("Symbol", keep = "last")].reset_index(drop = True)
+
+    def as_frame(closed):
+        return pd.DataFrame([(symbol, *bar) for symbol, rows in closed.items() for bar in rows],
+                            columns = ["Symbol", "Start", "open", "high", "low", "close"])
+
+    def same(bars, expected, columns = ("open", "high", "low", "close")):
+        bars = bars.sort_values(["Symbol", "Start"]).reset_index(drop = True)
+        return len(bars) == len(expected) and all(np.array_equal(
+            bars[column].to_numpy(), expected[column].to_numpy()) for column in columns)
+
+    expected, resample_time = timed(reference, timestamps)
+
+    def fold_ticks():
+        aggregator = BarAggregator()
+        closed = {}
+        for symbol, timestamp, price in zip(names.tolist(), timestamps.tolist(), prices.tolist()):
+            bar = aggregator.add(symbol, timestamp, price)
+            if bar is not None:
+                closed.setdefault(symbol, []).append(bar)
+        return closed
+
+    streamed, stream_time = timed(fold_ticks)
+    batched, batch_time = timed(BarAggregator().add_many, timestamps, names, prices)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            store_path = "ticks.bin"
+            TickStore(store_path).append_many(timestamps, names, prices)
+
+            written, catch_up_time = timed(update_live_bars, store_path = store_path,
+                                           chunk_ticks = ticks // 7)
+
+            def read_stored():
+                return pd.concat([pd.read_csv(live_bars_path.format(interval = interval, symbol = symbol))
+                                  for symbol in np.unique(names)], ignore_index = True)
+
+            stored = read_stored()
+
+            # as after a crash between write_bars and save_bar_state
+            os.remove(os.path.join(bars_dir(), "bars_state.json"))
+            update_live_bars(store_path = store_path, chunk_ticks = ticks // 7)
+            replay_same = len(read_stored()) == len(stored)
+            stored = stored.rename(columns = str.lower).rename(
+                columns = {"datetime": "Start", "timestamp": "Start", "symbol": "Symbol"})
+            stored_expected = reference(tick_times_utc(timestamps))
+            stored_expected["Start"] = stored_expected["Start"].dt.tz_localize("UTC").astype(str)
+            stored_same = written == len(expected) and same(
+                stored, stored_expected, ("Start", "Symbol", "open", "high", "low", "close"))
+        finally:
+            os.chdir(cwd)
+
+    print(f"{ticks} ticks, {len(expected)} closed {interval} bars: resample {resample_time:.2f}s, "
+          f"add {stream_time:.2f}s ({stream_time / ticks * 1e6:.2f}us per tick), "
+          f"add_many {batch_time:.2f}s, tick store catch-up {catch_up_time:.2f}s")
+    print(f"parity: add {check(same(as_frame(streamed), expected))}, "
+          f"add_many {check(same(as_frame(batched), expected))}, "
+          f"catch-up {check(stored_same)}, "
+          f"replay without state {check(replay_same)}")
+
+def bench_startup():
+    """
+    Import cost of each Main.py action (modules it loads),
+    compared with importing everything up front as Main.py
+    used to. Each line is a fresh interpreter.
+    """
+    import subprocess
+    from modules.import_profile import import_report
+
+    actions = {
+        "predictor / backtests / summary (runner)": ["modules.runner"],
+        "convert data (storage)": ["modules.storage"],
+        "sweep": ["modules.sweep"],
+        "price store": ["modules.price_store"],
+        "portfolio": ["modules.portfolio"],
+        "walk-forward": ["modules.walk_forward"],
+        "monte carlo": ["modules.monte_carlo"],
+        "live bars": ["modules.bars"],
+        "everything (old Main.py)": ["modules.runner", "modules.sweep", "modules.portfolio", 
+                                     "modules.walk_forward", "modules.monte_carlo", 
+                                     "yfinance", "requests"],
+    }
+
+    for action, modules in actions.items():
+        packages, total = import_report(modules, top = 4)
+        top = ", ".join(f"{row['Package']} {row['Self ms']:.0f}ms" for _, row in packages.iterrows())
+        print(f"{action}: {total:.0f}ms imports ({top})")
+
+    _, seconds = timed(subprocess.run, [sys.executable, "project/Main.py"], input = "6\n",
+                       capture_output = True, text = True, check = True)
+    print(f"Main.py option 6 (profit summary) end to end: {seconds:.2f}s")
+
+BENCHMARKS = {
+    "backtest": bench_backtest_engines,
+    "equity": bench_equity_curves,
+    "trades": bench_trade_store,
+    "result_cache": bench_result_cache,
+    "logging": bench_logging,
+    "price_log": bench_price_log,
+    "position": bench_add_position,
+    "storage": bench_storage,
+    "quotes": bench_quotes,
+    "rolling": bench_rolling_means,
+    "store": bench_price_store,
+    "streaming": bench_streaming,
+    "monte_carlo": bench_monte_carlo,
+    "bars": bench_bars,
+    "startup": bench_startup,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f"--- {name} ---")
+        BENCHMARKS[name]()
+
+    if failed_checks:
+        raise SystemExit(f"{len(failed_checks)} check(s) FAILED")
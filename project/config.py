@@ -2,28 +2,91 @@
 Configuration file for API keys, symbols, file path, 
 sleep time, history period, Fast / Slow MA
 
+api_key and symbols are loaded on first access
+(module __getattr__), symbols.txt is found next to
+this file whatever the working directory.
+
 """
+import importlib.util
+import os
 from datetime import datetime, timedelta
 
-from secrets import Alpha_Key
-api_key = Alpha_Key  # you dont have access to my Key
+project_dir = os.path.dirname(os.path.abspath(__file__))
+symbols_path = os.path.join(project_dir, "logs", "symbols.txt")
+secrets_path = os.path.join(project_dir, "secrets.py")
+
+def load_api_key():
+    """
+    Reads Alpha_Key from project/secrets.py, or from a
+    secrets module on sys.path when that file is missing.
+    """
+    if os.path.exists(secrets_path):
+        # by path, the stdlib secrets module is usually imported already
+        spec = importlib.util.spec_from_file_location("project_secrets", secrets_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        import secrets as module
+
+    return module.Alpha_Key  # you dont have access to my Key
+
+def load_symbols():
+    with open(symbols_path, "r") as file:
+        return [line.strip() for line in file]
 
+# loaded on first access, so actions that never touch them skip the work
+LAZY_SETTINGS = {
+    "api_key": load_api_key,
+    "symbols": load_symbols,
+}
 
-with open("project/logs/symbols.txt", "r") as file:
-    symbols = [line.strip() for line in file]
+def __getattr__(name):
+    if name not in LAZY_SETTINGS:
+        raise AttributeError(f"module 'config' has no attribute '{name}'")
+
+    value = LAZY_SETTINGS[name]()
+    globals()[name] = value
+    return value
 
-buy_threshold = 200
 sleep_time = 1
 history_period = "90d"
 interval = "1h"
 start_date = (datetime.today() - timedelta(days=729)).strftime("%Y-%m-%d")
 end_date = datetime.today().strftime("%Y-%m-%d")
 fixed_data_range = True
+incremental_history = True  # only download missing bars
+history_gap_days = 7  # stored gaps longer than this are backfilled
+history_adjust_tolerance = 1e-4  # relative Close change on re-downloaded bars that means the adjustment changed
+history_workers = 4  # parallel download threads
+history_batch_size = 1  # > 1 downloads several tickers per request
+history_retries = 3
+history_backoff = 2  # seconds, doubled on each retry
+
+quote_url = "https://www.alphavantage.co/query"
+quote_requests_per_minute = 75  # match your Alpha Vantage plan
+quote_burst = 5
+quote_workers = 5
+quote_timeout = 10  # seconds per symbol request
+quote_batch = False  # REALTIME_BULK_QUOTES (premium plans only)
+quote_batch_size = 100
+quote_cache_ttl = 60  # seconds a cached quote stays fresh
+quote_cache_path = "project/data/quote_cache.json"
 
 analysis_path = "project/data/analysis-{symbol}.csv"
 historical_data_path = "project/data/historical_prices-{symbol}.csv"
 trade_log_path = "project/data/all_trade_logs.csv"
 prices_log_path = "project/data/prices.txt"
+price_log_chunk_bytes = 64 * 1024 * 1024  # bytes per chunk when parsing prices.txt
+price_log_engine = "pyarrow"  # read_csv engine for prices.txt, "c" without pyarrow
+tick_store = True  # save_price also appends to the binary tick store
+tick_store_path = "project/data/ticks.bin"
+tick_timezone = None  # zone of the naive tick timestamps, None = this machine's
+live_bars = True  # run_predictor folds new ticks into bars
+live_bars_path = "project/data/Live/{interval}/historical_prices-{symbol}.csv"
+live_bar_offsets = {"1m": 0, "1h": 30, "1d": 0}  # minutes past the interval a bar starts (yfinance hourly bars start at :30)
+live_bars_in_analysis = True  # prepare_analysis adds live bars newer than the historical file
+strategy_state_path = "project/data/strategy_state.pkl"  # run_predictor's streaming MA state
+storage_format = "csv"  # "csv", "parquet" or "feather" (binary formats need pyarrow)
 
 run_log_path = "project/logs/run_log.txt"
 error_log_path = "project/logs/error_log.txt"
@@ -31,6 +94,16 @@ summary_log_path = "project/logs/summary.txt"
 profit_summary_csv = "project/logs/profit_summary.csv"
 profit_summary_txt = "project/logs/profit_summary.txt"
 
+async_logging = True  # queue log lines for a background writer thread
+log_queue_size = 10000  # callers wait when this many lines are queued
+log_flush_lines = 500
+log_flush_interval = 1.0  # seconds
+log_max_bytes = 50 * 1024 * 1024  # rotate log files past this size, 0 = never
+log_backups = 3
+
+incremental_analysis = True  # prepare_analysis only appends new bars
+analysis_warmup_rows = 50  # tail rows carried over, >= slowest MA window
+
 Fast_MA = "MA10"
 Slow_MA = "MA50"
 
@@ -43,3 +116,38 @@ wallet_balance = 1000
 fixed_fee = 0.1
 percentage_fee = 0.001
 slippage = 0.0005
+
+backtest_engine = "vectorized"  # "loop" or "vectorized"
+backtest_workers = 1  # > 1 runs symbols in a process pool
+backtest_source = "analysis"  # "analysis" files or the memory-mapped "store"
+price_store_dir = "project/data/store"
+
+result_cache = True  # reuse backtests whose inputs and settings are unchanged
+result_cache_dir = "project/data/result_cache"
+result_cache_max_mb = 100
+result_cache_fingerprint = "stat"  # "stat" (mtime + size) or "content" (SHA-256)
+
+max_open_positions = 5  # portfolio backtest, across all symbols
+portfolio_chunk_rows = 10000  # rows per read when streaming analysis CSVs
+portfolio_trade_log_path = "project/logs/portfolio_trades.csv"
+
+sweep_fast_windows = [5, 10, 20]
+sweep_slow_windows = [50, 100, 200]
+sweep_stop_losses = [-0.01, -0.02, -0.05]
+sweep_take_profits = [0.01, 0.02, 0.05]
+sweep_risks = [0.05]
+sweep_workers = 4
+sweep_results_path = "project/logs/sweep_results.csv"
+
+walk_forward_train_bars = 1000
+walk_forward_test_bars = 250
+walk_forward_workers = 4
+walk_forward_report_path = "project/logs/walk_forward_report.csv"
+walk_forward_equity_path = "project/logs/walk_forward_equity.csv"
+
+monte_carlo_simulations = 10000
+monte_carlo_method = "bootstrap"  # "bootstrap" (resample) or "shuffle" (reorder)
+monte_carlo_seed = 42
+monte_carlo_chunk_cells = 1_000_000  # values per simulation batch, bounds memory
+ruin_threshold = 0.5  # ruin = losing this fraction of the starting balance
+monte_carlo_results_path = "project/logs/monte_carlo.csv"
@@ -2,8 +2,52 @@
 Simulates backtesting based on signal and position data. 
 Tracks trades, P&L, and win rate.
 
+Two engines are available:
+- "loop": walks every bar with iterrows (reference engine)
+- "vectorized": finds entries/exits on NumPy arrays and only 
+loops over trades
+
 """
-from config import stop_loss, take_profit, risk_per_trade, fixed_fee, percentage_fee, slippage
+import numpy as np
+import pandas as pd
+
+from config import stop_loss, take_profit, risk_per_trade, fixed_fee, percentage_fee, slippage, interval
+from modules.trade_store import TradeStore, TRADE_LOG_COLUMNS
+
+# bump when engine output changes, invalidates cached backtest results
+ENGINE_VERSION = 4
+
+# columns the engines read, used to project analysis files on load
+BACKTEST_COLUMNS = ["Timestamp", "Symbol", "Price", "Position"]
+
+# bars per year used to annualise Sharpe / Sortino (about 7 hourly bars a trading day)
+PERIODS_PER_YEAR = {"1h": 252 * 7, "1d": 252}
+
+def long_profit(entry_price, exit_price, quantity, slippage, fixed_fee, percentage_fee,
+                still_open = False):
+    """
+    Profit of a long trade after slippage and fees, a trade
+    still open at the last bar only pays the entry fee.
+    """
+    if still_open:
+        fee = fixed_fee + (percentage_fee * entry_price)
+    else:
+        fee = fixed_fee + percentage_fee * (entry_price + exit_price)
+
+    return (exit_price * (1 - slippage) - entry_price * (1 + slippage)) * quantity - fee
+
+def short_profit(entry_price, exit_price, quantity, slippage, fixed_fee, percentage_fee,
+                 still_open = False):
+    """
+    Profit of a short trade after slippage and fees, a trade
+    still open at the last bar only pays the entry fee.
+    """
+    if still_open:
+        fee = fixed_fee + (percentage_fee * entry_price)
+    else:
+        fee = fixed_fee + percentage_fee * (entry_price + exit_price)
+
+    return (entry_price * (1 + slippage) - exit_price * (1 + slippage)) * quantity - fee
 
 def open_long_trade(row, balance, risk_per_trade):
     """
@@ -52,11 +96,7 @@ quantity
     
     sell_price = row["Price"]
 
-    actual_long_entry = entry_price * (1 + slippage)
-    actual_long_exit = sell_price * (1 - slippage)
-    
-    fee = fixed_fee + percentage_fee * (entry_price + sell_price)
-    profit = (actual_long_exit - actual_long_entry) * quantity - fee
+    profit = long_profit(entry_price, sell_price, quantity, slippage, fixed_fee, percentage_fee)
     
     cost_threshold =  (
         (entry_price + sell_price) * slippage +
@@ -84,7 +124,8 @@ quantity
         "Exit Time": row["Timestamp"],
         "Exit Price": row["Price"],
         "Closed Position": prev_position,
-        "Profit": round(profit, 2)
+        "Profit": round(profit, 2),
+        "Balance": round(balance, 2)
     }
     trade_log.append(trade_info)
 
@@ -113,11 +154,7 @@ def close_long_trade_signal(
 
     sell_price = row["Price"]
                 
-    actual_long_entry = entry_price * (1 + slippage)
-    actual_long_exit = sell_price * (1 - slippage)
-    
-    fee = fixed_fee + percentage_fee * (entry_price + sell_price)
-    profit = (actual_long_exit - actual_long_entry) * quantity - fee
+    profit = long_profit(entry_price, sell_price, quantity, slippage, fixed_fee, percentage_fee)
     
     cost_threshold =  (
         (entry_price + sell_price) * slippage +
@@ -145,7 +182,8 @@ def close_long_trade_signal(
         "Exit Time": row["Timestamp"],
         "Exit Price": row["Price"],
         "Closed Position": prev_position,
-        "Profit": round(profit, 2)
+        "Profit": round(profit, 2),
+        "Balance": round(balance, 2)
     }
     
     trade_log.append(trade_info)
@@ -175,11 +213,8 @@ quantity
     
     short_exit_price = row["Price"]
    
-    actual_short_entry = short_entry_price * (1 + slippage)
-    actual_short_exit =  short_exit_price * (1 + slippage)
-    
-    fee = fixed_fee + percentage_fee * (short_entry_price + short_exit_price)
-    profit = (actual_short_entry - actual_short_exit) * quantity - fee
+    profit = short_profit(short_entry_price, short_exit_price, quantity, 
+                          slippage, fixed_fee, percentage_fee)
     
     cost_threshold =  (
         (short_entry_price + short_exit_price) * slippage +
@@ -207,7 +242,8 @@ quantity
         "Exit Time": row["Timestamp"],
         "Exit Price": row["Price"],
         "Closed Position": prev_position,
-        "Profit": round(profit, 2)
+        "Profit": round(profit, 2),
+        "Balance": round(balance, 2)
     }
     trade_log.append(trade_info)
     
@@ -231,11 +267,8 @@ quantity
 ):
     short_exit_price = row["Price"]
             
-    actual_short_entry = short_entry_price * (1 + slippage)
-    actual_short_exit =  short_exit_price * (1 + slippage)
-    
-    fee = fixed_fee + percentage_fee * (short_entry_price + short_exit_price)
-    profit = (actual_short_entry - actual_short_exit) * quantity - fee
+    profit = short_profit(short_entry_price, short_exit_price, quantity, 
+                          slippage, fixed_fee, percentage_fee)
     
     cost_threshold =  (
         (short_entry_price + short_exit_price) * slippage +
@@ -263,7 +296,8 @@ quantity
         "Exit Time": row["Timestamp"],
         "Exit Price": row["Price"],
         "Closed Position": prev_position,
-        "Profit": round(profit, 2)
+        "Profit": round(profit, 2),
+        "Balance": round(balance, 2)
     }
     trade_log.append(trade_info)
     return balance, short_trades, total_trade
@@ -279,11 +313,8 @@ def close_remaining_long_trade(
     last_time = last_row["Timestamp"]
     last_symbol = last_row["Symbol"]
 
-    last_long_entry = entry_price * (1 + slippage)
-    last_long_exit = last_price * (1 - slippage)
-    
-    fee = fixed_fee + (percentage_fee * entry_price)
-    profit = (last_long_exit - last_long_entry) * quantity - fee
+    profit = long_profit(entry_price, last_price, quantity, slippage, fixed_fee, 
+                         percentage_fee, still_open = True)
     
     balance += profit
     
@@ -303,7 +334,8 @@ def close_remaining_long_trade(
         "Exit Time": last_time,
         "Exit Price": last_price,
         "Closed Position": prev_position,
-        "Profit": round(profit, 2)
+        "Profit": round(profit, 2),
+        "Balance": round(balance, 2)
         }
     trade_log.append(trade_info)
     return balance, long_trades, total_trade
@@ -318,11 +350,8 @@ def close_remaining_short_trade(
     last_symbol = last_row["Symbol"]
     last_time = last_row["Timestamp"]
 
-    last_short_entry = short_entry_price * (1 + slippage)
-    last_short_exit = last_price * (1 + slippage)
-
-    fee = fixed_fee + (percentage_fee * short_entry_price)
-    profit = (last_short_entry - last_short_exit) * quantity - fee
+    profit = short_profit(short_entry_price, last_price, quantity, slippage, fixed_fee, 
+                          percentage_fee, still_open = True)
 
     balance += profit
 
@@ -342,12 +371,13 @@ def close_remaining_short_trade(
         "Exit Time": last_time,
         "Exit Price": last_price,
         "Closed Position": prev_position,
-        "Profit": round(profit, 2)
+        "Profit": round(profit, 2),
+        "Balance": round(balance, 2)
     }
     trade_log.append(trade_info)
     return balance, short_trades, total_trade
 
-def backtest_signals(df, balance):
+def backtest_signals(df, balance, engine = "loop", curves = None, log_format = "records"):
 
     """
     Backtests trading performance based on a DataFrame 
@@ -366,12 +396,34 @@ def backtest_signals(df, balance):
     - Number of long and short trades
     - Detailed trade log (entry/exit, direction, profit)
     
+    engine selects the implementation: "loop" (default) 
+    or "vectorized", both return the same output.
+
+    curves (a dict, vectorized engine only) is filled with the
+    per-bar equity, see backtest_arrays.
+
+    log_format is the trade_log returned: "records" (list of
+    dicts), "frame" (DataFrame, see TradeStore.to_trade_log) or
+    "store" (the TradeStore, vectorized engine only).
+
     Returns:
     - results (dict): Summary statistics
-    - trade_log (list of dicts): Detailed record of all trades
+    - trade_log: Detailed record of all trades
     
     """
 
+    if engine == "vectorized":
+        return backtest_signals_vectorized(df, balance, curves, log_format)
+    
+    if engine != "loop":
+        raise ValueError(f"Unknown backtest engine: {engine}")
+
+    if curves is not None:
+        raise ValueError("Equity curves need the vectorized engine")
+
+    if log_format not in ("records", "frame"):
+        raise ValueError(f"The loop engine has no {log_format} trade log")
+
     total_money = 0
     total_trade = 0
     prev_position = 0
@@ -473,7 +525,7 @@ def backtest_signals(df, balance):
             balance, short_trades, total_trade = close_remaining_short_trade(
                 last_row, short_entry_price, short_entry_time, slippage, fixed_fee, 
                 percentage_fee, win_profit, loss_profit, trade_log, 
-                prev_position, short_trades, total_trade, quantity, balance) 
+                prev_position, short_trades, total_trade, balance, quantity) 
     
                    
     num_wins = len(win_profit)
@@ -499,6 +551,232 @@ def backtest_signals(df, balance):
         "Short Trades": short_trades
     }
 
+    if log_format == "frame":
+        return results, pd.DataFrame(trade_log, columns = TRADE_LOG_COLUMNS)
+
     return results, trade_log
 
+def find_trades(prices, positions, stop_loss = stop_loss, take_profit = take_profit):
+    """
+    Finds the entry and exit bar of every trade from 
+    Price and Position arrays.
+
+    A trade opens on the bar where Position changes to 1 or -1 
+    and closes on the first later bar that hits SL/TP or 
+    where Position changes again.
+
+    stop_loss / take_profit default to the config values.
+
+    Returns entry index, exit index, side 
+    and a flag for trades still open on the last bar.
+    """
+
+    n = len(positions)
+    prev_positions = np.empty(n, dtype = positions.dtype)
+    
+    if n == 0:
+        empty = np.array([], dtype = np.int64)
+        return empty, empty, positions[:0], np.array([], dtype = bool)
+    
+    prev_positions[0] = 0
+    prev_positions[1:] = positions[:-1]
+    
+    changes = np.flatnonzero(positions != prev_positions)
+    is_entry = (positions[changes] == 1) | (positions[changes] == -1)
+    
+    entries = changes[is_entry]
+    sides = positions[entries]
+
+    # first change after each entry ends the position segment
+    bounds = np.append(changes, n)
+    segment_ends = bounds[np.searchsorted(bounds, entries, side = "right")]
+
+    exits = np.empty(len(entries), dtype = np.int64)
+    still_open = np.zeros(len(entries), dtype = bool)
+
+    for i, (entry, end, side) in enumerate(zip(entries, segment_ends, sides)):
+        entry_price = prices[entry]
+        window = prices[entry + 1:min(end + 1, n)]
+
+        if side == 1:
+            pct_change = (window - entry_price) / entry_price
+        else:
+            pct_change = (entry_price - window) / entry_price
+        
+        hits = np.flatnonzero((pct_change <= stop_loss) | (pct_change >= take_profit))
+
+        if len(hits) > 0:
+            exits[i] = entry + 1 + hits[0]
+        elif end < n:
+            exits[i] = end
+        else:
+            exits[i] = n - 1
+            still_open[i] = True
+
+    return entries, exits, sides, still_open
+
+def backtest_signals_vectorized(df, balance, curves = None, log_format = "records"):
+    """
+    Array based version of backtest_signals.
+
+    Works out entries and exits on the Price, Position and 
+    Timestamp columns as NumPy arrays, then replays only the 
+    trades through the same open/close helpers, 
+    so results and trade_log match the loop engine.
+    """
+
+    return backtest_arrays(
+        df["Price"].to_numpy(dtype = float), df["Position"].to_numpy(), 
+        df["Timestamp"].tolist(), df["Symbol"].tolist(), balance, curves = curves,
+        log_format = log_format)
+
+def equity_curve(prices, entries, exits, sides, quantities, balances, balance):
+    """
+    Mark-to-market equity on every bar: the balance after the
+    trades closed so far plus the open trade's P&L at the bar price.
+
+    Returns (equity, held), held is the side of the open trade 
+    on each bar (0 when flat).
+    """
+    bars = np.arange(len(prices))
+    prices = np.asarray(prices, dtype = np.float64)
+
+    # trades never overlap, so entries and exits are both sorted
+    closed = np.searchsorted(exits, bars, side = "right")
+    equity = np.concatenate(([balance], balances))[closed]
+
+    trade = np.searchsorted(entries, bars, side = "right") - 1
+    is_open = trade >= 0
+    is_open[is_open] = bars[is_open] < exits[trade[is_open]]
+    trade = trade[is_open]
+
+    equity[is_open] += sides[trade] * quantities[trade] * (prices[is_open] - prices[entries[trade]])
+
+    held = np.zeros(len(prices), dtype = np.int8)
+    held[is_open] = sides[trade]
+
+    return equity, held
+
+def risk_metrics(equity, held, balances, balance, periods_per_year):
+    """
+    Max drawdown, Sharpe / Sortino (per-bar returns, annualised),
+    exposure and profit factor from the equity curves.
+
+    Drawdown is capped at 100%. Once equity is no longer positive
+    the account is wiped out, returns stop at that bar.
+    """
+    metrics = {"Max Drawdown": 0.0, "Sharpe": 0.0, "Sortino": 0.0, 
+               "Exposure": 0.0, "Profit Factor": 0.0}
+
+    if len(equity) == 0:
+        return metrics
+
+    peaks = np.maximum.accumulate(np.maximum(equity, balance))
+    metrics["Max Drawdown"] = float(min(((peaks - equity) / peaks).max(), 1.0) * 100)
+    metrics["Exposure"] = float(np.count_nonzero(held) / len(held) * 100)
+
+    wiped_out = np.flatnonzero(equity <= 0)
+    if len(wiped_out):
+        equity = equity[:wiped_out[0] + 1]
+
+    if len(equity) > 1:
+        returns = np.maximum(np.diff(equity) / equity[:-1], -1.0)
+        scale = np.sqrt(periods_per_year)
+        std = returns.std()
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+
+        metrics["Sharpe"] = float(returns.mean() / std * scale) if std > 0 else 0.0
+        metrics["Sortino"] = float(returns.mean() / downside * scale) if downside > 0 else 0.0
+
+    profits = np.diff(balances, prepend = balance)
+    gains = profits[profits > 0].sum()
+    losses = -profits[profits < 0].sum()
+
+    if losses > 0:
+        metrics["Profit Factor"] = float(gains / losses)
+    elif gains > 0:
+        metrics["Profit Factor"] = float("inf")
+
+    return metrics
+
+def replay_trades(prices, entries, exits, sides, still_open, symbols, balance, store,
+                  risk_per_trade = risk_per_trade):
+    """
+    Sizes and closes the trades found by find_trades into a
+    TradeStore, with the open / close helpers' sizing and
+    long_profit / short_profit (no dict per trade).
+    Returns the final balance.
+    """
+
+    for entry, exit, side, is_open in zip(
+        entries.tolist(), exits.tolist(), sides.tolist(), still_open.tolist()):
+
+        entry_price = float(prices[entry])
+        exit_price = float(prices[exit])
+        quantity = balance * risk_per_trade / entry_price
+
+        if side == 1:
+            profit = long_profit(entry_price, exit_price, quantity, slippage, fixed_fee,
+                                 percentage_fee, still_open = is_open)
+        else:
+            profit = short_profit(entry_price, exit_price, quantity, slippage, fixed_fee,
+                                  percentage_fee, still_open = is_open)
+
+        balance += profit
+
+        symbol = symbols if isinstance(symbols, str) else symbols[exit]
+        store.add(store.symbol_id(symbol), entry, exit, entry_price, exit_price, side,
+                  quantity, profit, balance)
+
+    return balance
+
+def backtest_arrays(prices, positions, times, symbols, balance, 
+                    stop_loss = stop_loss, take_profit = take_profit, 
+                    risk_per_trade = risk_per_trade, curves = None, log_format = "records"):
+    """
+    Vectorized backtest on plain arrays: prices and positions 
+    as NumPy arrays (memory-mapped arrays work too), times as 
+    anything indexable per bar and symbols as a per-bar list 
+    or a single symbol (used only for the trade log).
+
+    stop_loss, take_profit and risk_per_trade default to 
+    the config values, parameter sweeps pass their own.
+
+    When a curves dict is passed it is filled with "Equity" 
+    (per bar, mark-to-market), "Held" (open side per bar) and 
+    "Balance" (running balance after each trade), and results 
+    get the risk_metrics of those curves.
+
+    The trade_log returned is the TradeStore itself when
+    log_format is "store", a DataFrame when "frame" and a
+    list of dicts (loop engine format) when "records".
+    """
+
+    start_balance = balance
+    entries, exits, sides, still_open = find_trades(prices, positions, stop_loss, take_profit)
+
+    store = TradeStore(len(entries))
+    balance = replay_trades(prices, entries, exits, sides, still_open, symbols, 
+                            balance, store, risk_per_trade)
+
+    results = store.summary(balance)
+
+    if curves is not None:
+        trades = store.trades
+        equity, held = equity_curve(prices, trades["Entry Index"], trades["Exit Index"], 
+                                    trades["Side"].astype(np.int64), trades["Quantity"], 
+                                    trades["Balance"], start_balance)
+        
+        curves["Equity"] = equity
+        curves["Held"] = held
+        curves["Balance"] = trades["Balance"].copy()
+        results.update(risk_metrics(equity, held, curves["Balance"], start_balance, 
+                                    PERIODS_PER_YEAR.get(interval, 252)))
+
+    if log_format == "store":
+        return results, store
+
+    if log_format == "frame":
+        return results, store.to_trade_log(times)
 
+    return results, store.to_records(times)
@@ -0,0 +1,251 @@
+"""
+Folds live ticks into OHLC bars in the historical schema.
+
+BarAggregator keeps one open bar per symbol (start, open,
+high, low, close), so memory does not grow with the number
+of ticks. A bar is closed by the first tick of a later bar
+and only closed bars are written, appended to
+live_bars_path in the same columns as the yfinance files
+(Datetime / Timestamp, Close, High, Low, Open, Volume,
+Symbol, Price). Ticks carry no traded volume, so Volume is 0.
+
+update_live_bars reads the tick store from the last processed
+record (offset and open bars are kept in a state file), so
+the first run is a catch-up over the whole tick log and later
+runs only read new ticks. catch_up_live_bars first imports
+prices.txt when there is no tick store yet.
+
+prepare_analysis appends the live bars newer than the last
+historical bar to its input (live_bars_in_analysis).
+
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import interval, live_bars_path, live_bar_offsets, tick_store_path, tick_timezone, prices_log_path
+from modules.storage import frame_exists, write_frame, append_frame, read_frame_tail
+from modules.tick_store import TICK_DTYPE, read_tick_symbols, import_price_log
+from modules.utils import flush_logs
+
+BAR_INTERVALS = {
+    "1m": 60 * 10**9,
+    "1h": 3600 * 10**9,
+    "1d": 86400 * 10**9,
+}
+
+class BarAggregator:
+    """
+    Per-symbol open bars, [start, open, high, low, close] with
+    start in ns (UTC). Bars start live_bar_offsets minutes past
+    the interval, like the yfinance bars. Ticks older than a
+    symbol's open bar are dropped.
+    """
+
+    def __init__(self, bar_interval = None, bars = None):
+        self.interval = bar_interval or interval
+        self.step = BAR_INTERVALS[self.interval]
+        self.offset = live_bar_offsets.get(self.interval, 0) * 60 * 10**9
+        self.bars = bars or {}
+
+    def bar_start(self, timestamps):
+        """
+        Start (ns) of the bar holding each timestamp (ns).
+        """
+        return timestamps - (timestamps - self.offset) % self.step
+
+    def add(self, symbol, timestamp, price):
+        """
+        Folds one tick (ns timestamp) into its bar.
+        Returns the bar it closed, or None.
+        """
+        start = self.bar_start(timestamp)
+        bar = self.bars.get(symbol)
+
+        if bar is None or start > bar[0]:
+            self.bars[symbol] = [start, price, price, price, price]
+            return None if bar is None else tuple(bar)
+
+        if start == bar[0]:
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+
+        return None
+
+    def add_many(self, timestamps, symbols, prices):
+        """
+        Folds a batch of ticks with one groupby, same result as
+        calling add for each tick in order. Returns the closed
+        bars as {symbol: list of (start, open, high, low, close)}.
+        """
+        ticks = pd.DataFrame({"Symbol": symbols, "Start": self.bar_start(timestamps),
+                              "Price": prices})
+
+        open_starts = ticks["Symbol"].map({symbol: bar[0] for symbol, bar in self.bars.items()})
+        ticks = ticks[~(ticks["Start"] < open_starts)]
+
+        grouped = ticks.groupby(["Symbol", "Start"], sort = True)["Price"]
+        bars = pd.DataFrame({"Open": grouped.first(), "High": grouped.max(),
+                             "Low": grouped.min(), "Close": grouped.last()}).reset_index()
+
+        closed = {}
+        for symbol, rows in bars.groupby("Symbol", sort = False):
+            rows = [list(row) for row in zip(rows["Start"].tolist(), rows["Open"].tolist(),
+                    rows["High"].tolist(), rows["Low"].tolist(), rows["Close"].tolist())]
+            bar = self.bars.get(symbol)
+
+            # merge the batch into the bar that was already open
+            if bar is not None and rows[0][0] == bar[0]:
+                first = rows[0]
+                rows[0] = [bar[0], bar[1], max(bar[2], first[2]), min(bar[3], first[3]), first[4]]
+            elif bar is not None:
+                rows.insert(0, bar)
+
+            self.bars[symbol] = rows[-1]
+            closed[symbol] = [tuple(row) for row in rows[:-1]]
+
+        return closed
+
+def bar_frame(symbol, bars, bar_interval = None):
+    """
+    Closed bars of one symbol as rows of the historical schema.
+    """
+    bar_interval = bar_interval or interval
+    starts, opens, highs, lows, closes = zip(*bars)
+    times = pd.to_datetime(np.array(starts, dtype = np.int64), utc = True)
+
+    if bar_interval == "1d":
+        column, times = "Timestamp", times.strftime("%Y-%m-%d")
+    else:
+        column, times = "Datetime", times.astype(str)
+
+    return pd.DataFrame({
+        column: times,
+        "Close": closes,
+        "High": highs,
+        "Low": lows,
+        "Open": opens,
+        "Volume": 0,
+        "Symbol": symbol,
+        "Price": closes,
+    })
+
+def bars_dir(bar_interval = None):
+    return os.path.dirname(live_bars_path.format(interval = bar_interval or interval, symbol = ""))
+
+def write_bars(closed, bar_interval = None):
+    """
+    Appends closed bars to each symbol's live bars file.
+    Bars up to the last one in the file are skipped, so bars
+    written before a crash are not written again.
+    """
+    bar_interval = bar_interval or interval
+
+    for symbol, bars in closed.items():
+        if not bars:
+            continue
+
+        path = live_bars_path.format(interval = bar_interval, symbol = symbol)
+        exists = frame_exists(path)
+
+        if exists:
+            last = pd.Timestamp(read_frame_tail(path, 1).iloc[-1, 0])
+            last = (last.tz_localize("UTC") if last.tz is None else last).value
+            bars = [bar for bar in bars if bar[0] > last]
+            if not bars:
+                continue
+
+        df = bar_frame(symbol, bars, bar_interval)
+
+        if exists:
+            append_frame(df, path)
+        else:
+            write_frame(df, path)
+
+def tick_times_utc(timestamps):
+    """
+    Converts naive tick timestamps (ns, tick_timezone or this
+    machine's zone) to UTC ns.
+    """
+    tz = tick_timezone or datetime.now().astimezone().tzinfo
+    times = pd.DatetimeIndex(timestamps.astype("datetime64[ns]"))
+    # repeated DST hour is read as standard time, skipped hour is shifted
+    times = times.tz_localize(tz, ambiguous = np.zeros(len(times), dtype = bool),
+                              nonexistent = "shift_forward")
+
+    return times.tz_convert("UTC").tz_localize(None).to_numpy(dtype = "datetime64[ns]").view(np.int64)
+
+def load_bar_state(bar_interval = None):
+    path = os.path.join(bars_dir(bar_interval), "bars_state.json")
+
+    if not os.path.exists(path):
+        return 0, {}
+
+    with open(path, "r") as file:
+        state = json.load(file)
+
+    return state["offset"], state["bars"]
+
+def save_bar_state(offset, bars, bar_interval = None):
+    path = os.path.join(bars_dir(bar_interval), "bars_state.json")
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w") as file:
+        json.dump({"offset": offset, "bars": bars}, file)
+    os.replace(tmp_path, path)
+
+def update_live_bars(bar_interval = None, store_path = None, chunk_ticks = 1_000_000):
+    """
+    Folds the ticks added to the tick store since the last run
+    into bars and appends the closed ones. Returns the number
+    of closed bars written.
+    """
+    bar_interval = bar_interval or interval
+    store_path = store_path or tick_store_path
+
+    # ticks may still be queued in the log writer
+    flush_logs()
+
+    if not os.path.exists(store_path):
+        return 0
+
+    os.makedirs(bars_dir(bar_interval), exist_ok = True)
+
+    offset, bars = load_bar_state(bar_interval)
+    aggregator = BarAggregator(bar_interval, bars)
+    symbols = np.array(read_tick_symbols(store_path), dtype = object)
+
+    total = os.path.getsize(store_path) // TICK_DTYPE.itemsize
+    written = 0
+
+    # catch-up over a long tick log runs in bounded chunks
+    while offset < total:
+        count = min(chunk_ticks, total - offset)
+        records = np.fromfile(store_path, dtype = TICK_DTYPE, count = count,
+                              offset = offset * TICK_DTYPE.itemsize)
+
+        closed = aggregator.add_many(tick_times_utc(records["Timestamp"]),
+                                     symbols[records["Symbol"]], records["Price"])
+        # a crash before save_bar_state replays these ticks, write_bars skips their bars
+        write_bars(closed, bar_interval)
+
+        written += sum(len(rows) for rows in closed.values())
+        offset += count
+        save_bar_state(offset, aggregator.bars, bar_interval)
+
+    return written
+
+def catch_up_live_bars(bar_interval = None):
+    """
+    Builds bars from the tick store, importing prices.txt
+    into it first when the store does not exist yet.
+    """
+    if not os.path.exists(tick_store_path) and os.path.exists(prices_log_path):
+        print(f"Imported {import_price_log(prices_log_path)} ticks from {prices_log_path}")
+
+    return update_live_bars(bar_interval)
@@ -0,0 +1,59 @@
+"""
+Import-time profile of the project modules.
+
+Imports modules in a fresh interpreter with
+python -X importtime (project/ on sys.path, like Main.py)
+and adds up the self time of everything they pull in,
+per top-level package.
+
+"""
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from config import project_dir
+
+def profile_imports(modules):
+    """
+    Imports modules in a new interpreter and returns one row
+    per imported module: Module, Package, Self ms, Cumulative ms.
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [project_dir, env.get("PYTHONPATH")]))
+
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env = env,
+                            capture_output = True, text = True, check = True).stderr
+
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue
+
+        name = name.strip()
+        rows.append({
+            "Module": name,
+            "Package": name.split(".")[0] if not name.startswith("modules.") else name,
+            "Self ms": int(own) / 1000,
+            "Cumulative ms": int(cumulative) / 1000,
+        })
+
+    return pd.DataFrame(rows)
+
+def import_report(modules, top = 10):
+    """
+    Per-package import cost of modules (largest first, the
+    top rows) and the total import time in ms.
+    """
+    df = profile_imports(modules)
+    packages = df.groupby("Package", as_index = False)["Self ms"].sum()
+    packages = packages.sort_values("Self ms", ascending = False, ignore_index = True)
+
+    return packages.head(top), df["Self ms"].sum()
@@ -16,6 +16,45 @@ def add_ma(df, window):
     
     return df
 
+def rolling_means(prices, windows):
+    """
+    Computes moving averages for many windows at once from 
+    a single cumulative-sum array.
+    
+    Returns a 2-D float array, row i is the MA for windows[i] 
+    (rows are views, no DataFrame columns are created).
+    NaN warm-up matches add_ma: the first window-1 values, 
+    and any window containing a NaN price, are NaN.
+    """
+
+    values = np.asarray(prices, dtype = float)
+    n = len(values)
+    means = np.full((len(windows), n), np.nan)
+
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return means
+    
+    # summing offsets from the first price keeps the cumsum error small
+    offset = values[valid][0]
+    cumulative = np.zeros(n + 1)
+    np.cumsum(np.where(valid, values - offset, 0.0), out = cumulative[1:])
+    
+    nan_count = np.zeros(n + 1, dtype = np.int64)
+    np.cumsum(~valid, out = nan_count[1:])
+
+    for row, window in enumerate(windows):
+        if window > n:
+            continue
+        
+        window_sums = cumulative[window:] - cumulative[:-window]
+        window_means = means[row, window - 1:]
+        np.divide(window_sums, window, out = window_means)
+        window_means += offset
+        window_means[nan_count[window:] - nan_count[:-window] > 0] = np.nan
+
+    return means
+
 def add_percent_change(df):
     """
     Calculates and adds percentage price change between rows.
@@ -0,0 +1,172 @@
+"""
+Buffered, asynchronous writer for the text log files.
+
+Callers queue finished lines (path, line) on a bounded queue
+and return at once. A background thread writes them in
+batches: when log_flush_lines lines are waiting or
+log_flush_interval seconds have passed, each file is opened
+once and all of its lines are written together.
+
+Files are rotated like logging's RotatingFileHandler
+(path.1 ... path.N) once they pass log_max_bytes, and the
+queue is flushed on exit. Line formats are left to the
+callers; bytes items are appended in binary mode and never
+rotated (binary stores like the tick store).
+
+"""
+
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import util
+
+from config import log_queue_size, log_flush_lines, log_flush_interval, log_max_bytes, log_backups
+
+_FLUSH = object()
+_STOP = object()
+
+def rotate_file(path, backups):
+    """
+    Shifts path.1 ... path.{backups - 1} up by one
+    and moves path to path.1.
+    """
+    if backups <= 0:
+        os.remove(path)
+        return
+
+    for index in range(backups - 1, 0, -1):
+        source = f"{path}.{index}"
+        if os.path.exists(source):
+            os.replace(source, f"{path}.{index + 1}")
+
+    os.replace(path, f"{path}.1")
+
+class LogWriter:
+    """
+    Background thread that appends queued lines to their files.
+    """
+
+    def __init__(self, max_queue = log_queue_size, flush_lines = log_flush_lines,
+                 flush_interval = log_flush_interval, max_bytes = log_max_bytes,
+                 backups = log_backups):
+        self.queue = queue.Queue(maxsize = max_queue)
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.closed = False
+
+        self.thread = threading.Thread(target = self.run, name = "log-writer", daemon = True)
+        self.thread.start()
+
+    def write(self, path, line):
+        """
+        Queues one line for path, blocks only while the queue is full.
+        """
+        if self.closed:
+            write_lines(path, [line], self.max_bytes, self.backups)
+            return
+
+        self.queue.put((path, line))
+
+    def flush(self):
+        """
+        Waits until every line queued so far is written.
+        """
+        if not self.closed:
+            self.queue.put(_FLUSH)
+            self.queue.join()
+
+    def close(self):
+        """
+        Writes what is left and stops the thread.
+        """
+        if self.closed:
+            return
+
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.closed = True
+
+    def run(self):
+        pending = {}
+        count = 0
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self.queue.get(timeout = max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not _FLUSH and item is not _STOP:
+                pending.setdefault(item[0], []).append(item[1])
+                count += 1
+
+            if item is None or item is _FLUSH or item is _STOP or count >= self.flush_lines:
+                for path, lines in pending.items():
+                    write_lines(path, lines, self.max_bytes, self.backups)
+
+                for _ in range(count):
+                    self.queue.task_done()
+
+                pending = {}
+                count = 0
+                deadline = time.monotonic() + self.flush_interval
+
+            if item is _FLUSH or item is _STOP:
+                self.queue.task_done()
+
+            if item is _STOP:
+                return
+
+def write_lines(path, lines, max_bytes, backups):
+    """
+    Appends lines to path in one write, rotating it first
+    if they would take it past max_bytes (0 = never).
+    """
+    if isinstance(lines[0], bytes):
+        data = b"".join(lines)
+        mode = "ab"
+    else:
+        data = "".join(lines)
+        mode = "a"
+
+    try:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if mode == "a" and max_bytes > 0 and size > 0 and size + len(data) > max_bytes:
+            rotate_file(path, backups)
+
+        with open(path, mode) as file:
+            file.write(data)
+
+    except OSError as e:
+        # log_error writes through this module, report on stderr instead
+        print(f"Log write to {path} failed: {e}", file = sys.stderr)
+
+_log_writer = None
+
+def get_log_writer():
+    """
+    Returns the log writer of this process (started once,
+    flushed on interpreter or worker process exit).
+    """
+    global _log_writer
+
+    if _log_writer is None:
+        _log_writer = LogWriter()
+        atexit.register(_log_writer.close)
+        # multiprocessing workers skip atexit, their finalizers still run
+        util.Finalize(_log_writer, _log_writer.close, exitpriority = 10)
+
+    return _log_writer
+
+def _reset_after_fork():
+    # the writer thread does not survive fork, children start their own
+    global _log_writer
+    _log_writer = None
+
+os.register_at_fork(after_in_child = _reset_after_fork)
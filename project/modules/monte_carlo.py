@@ -0,0 +1,126 @@
+"""
+Monte Carlo / bootstrap robustness checks on trade logs.
+
+The per-trade Profit series is resampled with replacement
+("bootstrap") or reordered ("shuffle") many times. Every
+batch of simulations is one (simulations x trades) matrix,
+equity paths are its cumulative sums.
+
+Random numbers come from seeded numpy Generators, one
+independent stream per symbol, so runs are repeatable.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import (symbols, wallet_balance, trade_log_path, monte_carlo_simulations,
+    monte_carlo_method, monte_carlo_seed, monte_carlo_chunk_cells, ruin_threshold,
+    monte_carlo_results_path)
+
+def simulate_equity(profits, balance, simulations = None, method = None, rng = None,
+                    chunk_cells = None):
+    """
+    Simulates equity paths from a Profit series.
+
+    Returns (final equity, max drawdown, ruined) arrays with one
+    value per simulation. Max drawdown is a fraction of the running
+    peak, a path is ruined once equity drops to
+    balance * (1 - ruin_threshold).
+    """
+    profits = np.asarray(profits, dtype = np.float64)
+    simulations = simulations or monte_carlo_simulations
+    method = method or monte_carlo_method
+    rng = rng or np.random.default_rng(monte_carlo_seed)
+    chunk_cells = chunk_cells or monte_carlo_chunk_cells
+
+    final = np.empty(simulations)
+    max_drawdown = np.empty(simulations)
+    ruined = np.empty(simulations, dtype = bool)
+
+    if len(profits) == 0:
+        final.fill(balance)
+        max_drawdown.fill(0)
+        ruined.fill(False)
+        return final, max_drawdown, ruined
+
+    # bounded batches keep the path matrix at chunk_cells values
+    rows = max(1, chunk_cells // len(profits))
+
+    for start in range(0, simulations, rows):
+        stop = min(start + rows, simulations)
+
+        if method == "bootstrap":
+            samples = profits[rng.integers(0, len(profits), size = (stop - start, len(profits)))]
+        elif method == "shuffle":
+            samples = rng.permuted(np.tile(profits, (stop - start, 1)), axis = 1)
+        else:
+            raise ValueError(f"Unknown Monte Carlo method: {method}")
+
+        # in place: samples become the equity paths, peaks the equity / peak ratio
+        equity = np.cumsum(samples, axis = 1, out = samples)
+        equity += balance
+
+        peaks = np.maximum.accumulate(equity, axis = 1)
+        np.maximum(peaks, balance, out = peaks)
+
+        final[start:stop] = equity[:, -1]
+        ruined[start:stop] = equity.min(axis = 1) <= balance * (1 - ruin_threshold)
+        max_drawdown[start:stop] = 1 - np.divide(equity, peaks, out = peaks).min(axis = 1)
+
+    return final, max_drawdown, ruined
+
+def summarize_simulations(name, trades, balance, final, max_drawdown, ruined):
+    """
+    Turns simulation arrays into one summary row.
+    """
+    final_p5, final_p50, final_p95 = np.percentile(final, [5, 50, 95])
+    drawdown_p50, drawdown_p95 = np.percentile(max_drawdown, [50, 95])
+
+    return {
+        "Symbol": name,
+        "Trades": trades,
+        "Simulations": len(final),
+        "Start Balance": balance,
+        "Final Equity Mean": final.mean(),
+        "Final Equity P5": final_p5,
+        "Final Equity P50": final_p50,
+        "Final Equity P95": final_p95,
+        "Max Drawdown P50": drawdown_p50 * 100,
+        "Max Drawdown P95": drawdown_p95 * 100,
+        "Risk of Ruin": ruined.mean() * 100,
+    }
+
+def run_monte_carlo(df = None, simulations = None, method = None, seed = None, save = True):
+    """
+    Runs the Monte Carlo check per symbol (per-stock balance)
+    and for the whole portfolio (wallet_balance) on the given
+    trade log DataFrame, or on trade_log_path when none is passed.
+
+    Returns the summary table, saved to monte_carlo_results_path.
+    """
+    if df is None:
+        df = pd.read_csv(trade_log_path)
+
+    seed = monte_carlo_seed if seed is None else seed
+    per_stock_balance = wallet_balance / len(symbols)
+
+    groups = [(symbol, group["Profit"].to_numpy(), per_stock_balance)
+              for symbol, group in df.groupby("Symbol", sort = True)]
+    groups.append(("Portfolio", df["Profit"].to_numpy(), wallet_balance))
+
+    streams = np.random.SeedSequence(seed).spawn(len(groups))
+
+    rows = []
+    for (name, profits, balance), stream in zip(groups, streams):
+        final, max_drawdown, ruined = simulate_equity(
+            profits, balance, simulations, method, np.random.default_rng(stream))
+        rows.append(summarize_simulations(name, len(profits), balance,
+                                          final, max_drawdown, ruined))
+
+    summary = pd.DataFrame(rows)
+
+    if save:
+        summary.to_csv(monte_carlo_results_path, index = False)
+
+    return summary
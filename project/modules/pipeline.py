@@ -0,0 +1,133 @@
+"""
+Chains the fetch -> analyze -> backtest -> summary stages
+in one process.
+
+Each stage still writes its usual files (historical data,
+analysis files, trade logs, profit summary) but hands its
+DataFrames to the next stage in memory, so a chained run
+does not read back what it just wrote. A stage that starts
+a chain loads its input from disk.
+
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from config import symbols, wallet_balance, backtest_engine, backtest_workers, trade_log_path
+from modules.backtest import backtest_signals, BACKTEST_COLUMNS
+from modules.price_fetcher import bulk_historical_data
+from modules.runner import (prepare_analysis, backtest_all_symbols, print_backtest_results,
+    write_trade_files, combine_trade_logs, profit_summary)
+
+def fetch_stage(data):
+    """
+    Downloads history for every symbol (as get_all_historical_data),
+    keeps the saved frames in data["history"].
+    """
+    frames = {}
+    statuses = pd.DataFrame(bulk_historical_data(symbols, frames = frames))
+
+    failed = (statuses["Status"] != "ok").sum()
+    print(f"{len(statuses) - failed} of {len(statuses)} symbols updated")
+
+    data["history"] = frames
+
+def analyze_stage(data):
+    """
+    Runs prepare_analysis (incremental when configured) on the
+    fetched histories, keeps the analysis frames in data["analysis"].
+    """
+    data["analysis"] = prepare_analysis(history = data.get("history"), keep = True)
+
+def backtest_frame(symbol, df, balance, with_curves):
+    """
+    Backtests one analysis frame and writes its trade files,
+    returns (results, trade_log). Module level so it can run
+    inside a worker process.
+    """
+    curves = {} if with_curves else None
+    results, trade_log = backtest_signals(df, balance = balance, engine = backtest_engine,
+                                          curves = curves, log_format = "frame")
+    write_trade_files(symbol, trade_log, curves)
+    return results, trade_log
+
+def backtest_stage(data, workers = None):
+    """
+    Backtests the analysed frames (or the analysis files through
+    backtest_all_symbols when there are none in memory), prints
+    each symbol's stats and writes its trade files.
+    Keeps (symbol, results, trade_log) in data["backtests"].
+    """
+    workers = backtest_workers if workers is None else workers
+
+    if "analysis" not in data:
+        outputs = backtest_all_symbols(workers)
+    else:
+        balance = wallet_balance / len(symbols)
+        with_curves = backtest_engine != "loop"
+        frames = [data["analysis"][symbol][BACKTEST_COLUMNS] for symbol in symbols]
+        balances = [balance] * len(frames)
+        flags = [with_curves] * len(frames)
+
+        if workers > 1 and len(frames) > 1:
+            with ProcessPoolExecutor(max_workers = workers) as executor:
+                computed = list(executor.map(backtest_frame, symbols, frames, balances, flags))
+        else:
+            computed = list(map(backtest_frame, symbols, frames, balances, flags))
+
+        outputs = [(symbol, results, trade_log) for symbol, (results, trade_log) in zip(symbols, computed)]
+
+    for symbol, results, _ in outputs:
+        print_backtest_results(symbol, results)
+
+    data["backtests"] = outputs
+
+def summary_stage(data):
+    """
+    Writes the combined trade log and the profit summary from the
+    backtests in memory, or from trade_log_path without them.
+    """
+    if "backtests" not in data:
+        profit_summary()
+        return
+
+    df_all_trade = combine_trade_logs(trade_log for _, _, trade_log in data["backtests"])
+    df_all_trade.to_csv(trade_log_path, index = False)
+
+    profit_summary(df_all_trade)
+    data["trades"] = df_all_trade
+
+STAGES = {
+    "fetch": fetch_stage,
+    "analyze": analyze_stage,
+    "backtest": backtest_stage,
+    "summary": summary_stage,
+}
+
+def run_pipeline(stages, workers = None):
+    """
+    Runs the named stages in the given order, passing one data
+    dict between them. Prints each stage's wall time at the end
+    and returns the data dict.
+    """
+    data = {}
+    timings = []
+
+    for stage in stages:
+        start = time.perf_counter()
+
+        if stage == "backtest":
+            STAGES[stage](data, workers)
+        else:
+            STAGES[stage](data)
+
+        timings.append((stage, time.perf_counter() - start))
+
+    print("Stage timings:")
+    for stage, seconds in timings:
+        print(f"  {stage:<10}{seconds:8.2f}s")
+    print(f"  {'total':<10}{sum(seconds for _, seconds in timings):8.2f}s")
+
+    return data
@@ -0,0 +1,228 @@
+"""
+Portfolio-level backtest with one shared wallet.
+
+All symbols' bar streams are k-way merged by timestamp
+(heapq.merge over per-symbol iterators) and run through a
+single event loop, so positions across symbols compete for
+the same balance and a max-concurrent-positions limit.
+Bars are streamed, the universe is never concatenated
+into one DataFrame.
+
+"""
+
+import heapq
+
+import pandas as pd
+
+from config import (symbols, wallet_balance, risk_per_trade, stop_loss, take_profit,
+    fixed_fee, percentage_fee, slippage, max_open_positions,
+    backtest_source, portfolio_chunk_rows, portfolio_trade_log_path, storage_format)
+from modules.backtest import (open_long_trade, open_short_trade,
+    close_long_trade_signal, close_short_trade_signal)
+from modules.price_store import open_price_store
+from modules.storage import read_frame, read_frame_tail, storage_path, analysis_file
+from modules.strategy import strategy_positions
+
+def format_time(timestamp, tz):
+    """
+    Formats an int64 ns timestamp like the CSV files.
+    """
+    timestamp = pd.Timestamp(timestamp, tz = tz)
+
+    if tz is None and timestamp == timestamp.normalize():
+        return timestamp.strftime("%Y-%m-%d")
+
+    return str(timestamp)
+
+def store_bars(store, symbol):
+    """
+    Yields (time, symbol, price, position) bars of one symbol
+    from the memory-mapped price store.
+    """
+    prices = store.prices(symbol)
+    positions = strategy_positions(prices)
+    times = store.timestamps(symbol)
+
+    for time, price, position in zip(times, prices, positions):
+        yield int(time), symbol, float(price), int(position)
+
+def analysis_bars(symbol, chunk_rows = None):
+    """
+    Yields (time, symbol, price, position) bars of one symbol
+    from its analysis file (CSVs are read in chunks of 
+    chunk_rows rows, binary formats column-projected).
+    """
+    path = analysis_file(symbol)
+    columns = ["Timestamp", "Price", "Position"]
+
+    if storage_format == "csv":
+        chunks = pd.read_csv(storage_path(path), usecols = columns,
+                             chunksize = chunk_rows or portfolio_chunk_rows)
+    else:
+        chunks = [read_frame(path, columns = columns)]
+
+    for chunk in chunks:
+        times = pd.to_datetime(chunk["Timestamp"])
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+
+        for time, price, position in zip(times.to_numpy(dtype = "datetime64[ns]").view("int64"),
+                                         chunk["Price"].tolist(), chunk["Position"].tolist()):
+            yield int(time), symbol, price, position
+
+def analysis_tz(symbol):
+    """
+    Timezone of a symbol's analysis timestamps (None when naive).
+    """
+    df = read_frame_tail(analysis_file(symbol), 1)
+    return pd.to_datetime(df["Timestamp"]).dt.tz
+
+def portfolio_bars(portfolio_symbols = None, source = None):
+    """
+    Merges every symbol's bar stream into one stream
+    ordered by timestamp. Returns (bars, tz).
+    """
+    portfolio_symbols = portfolio_symbols or symbols
+    source = source or backtest_source
+
+    if source == "store":
+        store = open_price_store()
+        streams = [store_bars(store, symbol) for symbol in portfolio_symbols]
+        tz = store.tz
+    else:
+        streams = [analysis_bars(symbol) for symbol in portfolio_symbols]
+        tz = analysis_tz(portfolio_symbols[0])
+
+    return heapq.merge(*streams, key = lambda bar: bar[0]), tz
+
+def close_trade(trade, price, time, counts, balance, win_profit, loss_profit, trade_log):
+    """
+    Closes an open trade with the single-symbol close helpers.
+    Returns the new balance.
+    """
+    row = {"Price": price, "Timestamp": time, "Symbol": trade["Symbol"]}
+
+    if trade["Side"] == 1:
+        balance, counts["Long Trades"], counts["Total Trades"] = close_long_trade_signal(
+            row, trade["Entry Price"], trade["Entry Time"], slippage, fixed_fee,
+            percentage_fee, win_profit, loss_profit, trade_log, trade["Side"],
+            counts["Long Trades"], counts["Total Trades"], balance, trade["Quantity"])
+    else:
+        balance, counts["Short Trades"], counts["Total Trades"] = close_short_trade_signal(
+            row, trade["Entry Price"], trade["Entry Time"], slippage, fixed_fee,
+            percentage_fee, win_profit, loss_profit, trade_log, trade["Side"],
+            counts["Short Trades"], counts["Total Trades"], balance, trade["Quantity"])
+
+    return balance
+
+def backtest_portfolio(portfolio_symbols = None, balance = None, max_positions = None,
+                       source = None):
+    """
+    Backtests all symbols against one shared balance.
+
+    Same entry/exit rules as backtest_signals, but trade size is
+    risk_per_trade of the shared balance, a new trade needs that
+    much uncommitted cash, and at most max_positions trades are
+    open at once (config.max_open_positions).
+
+    Returns (results, trade_log) like backtest_signals, results
+    also count entries skipped by the limits.
+    """
+    balance = wallet_balance if balance is None else balance
+    max_positions = max_positions or max_open_positions
+
+    bars, tz = portfolio_bars(portfolio_symbols, source)
+
+    open_trades = {}
+    prev_positions = {}
+    last_bars = {}
+    committed = 0
+    skipped = 0
+    counts = {"Total Trades": 0, "Long Trades": 0, "Short Trades": 0}
+
+    trade_log = []
+    win_profit = []
+    loss_profit = []
+
+    for time, symbol, price, position in bars:
+        prev_position = prev_positions.get(symbol, 0)
+        trade = open_trades.get(symbol)
+
+        # --- close on SL/TP or position change ---
+        if trade is not None:
+            if trade["Side"] == 1:
+                pct_change = (price - trade["Entry Price"]) / trade["Entry Price"]
+            else:
+                pct_change = (trade["Entry Price"] - price) / trade["Entry Price"]
+
+            if pct_change <= stop_loss or pct_change >= take_profit or position != trade["Side"]:
+                balance = close_trade(trade, price, format_time(time, tz), counts, balance,
+                                      win_profit, loss_profit, trade_log)
+                committed -= trade["Amount"]
+                del open_trades[symbol]
+
+        # --- open on a new 1 / -1 position ---
+        if position in (1, -1) and prev_position != position:
+            amount = balance * risk_per_trade
+
+            if len(open_trades) >= max_positions or amount > balance - committed:
+                skipped += 1
+            else:
+                row = {"Price": price, "Timestamp": format_time(time, tz)}
+                open_trade = open_long_trade if position == 1 else open_short_trade
+                entry_price, entry_time, amount, quantity = open_trade(row, balance, risk_per_trade)
+
+                open_trades[symbol] = {
+                    "Symbol": symbol, "Side": position, "Entry Price": entry_price,
+                    "Entry Time": entry_time, "Quantity": quantity, "Amount": amount}
+                committed += amount
+
+        prev_positions[symbol] = position
+        last_bars[symbol] = (time, price)
+
+    # close what is still open on each symbol's last bar
+    for symbol, trade in list(open_trades.items()):
+        time, price = last_bars[symbol]
+        balance = close_trade(trade, price, format_time(time, tz), counts, balance,
+                              win_profit, loss_profit, trade_log)
+
+    num_wins = len(win_profit)
+    num_losses = len(loss_profit)
+    total_trade = num_wins + num_losses
+
+    wr = num_wins / total_trade if total_trade > 0 else 0
+    average_win = sum(win_profit) / num_wins if num_wins > 0 else 0
+    average_loss = abs(sum(loss_profit)) / num_losses if num_losses > 0 else 0
+
+    expectancy = wr * average_win - (1 - wr) * average_loss
+
+    results = {
+        "Total Trades": total_trade,
+        "Win Rate": wr*100,
+        "Wins": num_wins,
+        "Average Win": average_win,
+        "Losses": num_losses,
+        "Average Loss": average_loss,
+        "expectancy": round(expectancy, 2),
+        "Total Profit": round(balance, 2),
+        "Long Trades": counts["Long Trades"],
+        "Short Trades": counts["Short Trades"],
+        "Skipped Entries": skipped
+    }
+
+    return results, trade_log
+
+def run_portfolio_backtest():
+    """
+    Runs the portfolio backtest, prints the summary
+    and saves the trade log to portfolio_trade_log_path.
+    """
+    results, trade_log = backtest_portfolio()
+
+    print("Portfolio backtest:")
+    for key, value in results.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+    pd.DataFrame(trade_log).to_csv(portfolio_trade_log_path, index = False)
+
+    return results, trade_log
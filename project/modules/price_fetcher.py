@@ -2,79 +2,710 @@
 Fetches real-time and historical stock prices 
 using Alpha Vantage and yfinance.
 
+requests, yfinance and the API key are imported on first
+use, so importing this module (e.g. for historical_path)
+stays cheap for the offline actions.
+
 """
 
-import requests
-import yfinance as yf
 import pandas as pd
+import json
 import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
-
-from config import api_key, history_period, historical_data_path, interval, start_date, end_date, fixed_data_range
+from config import history_period, historical_data_path, interval, start_date, end_date, fixed_data_range
+from config import history_gap_days, history_adjust_tolerance, history_workers, history_batch_size
+from config import incremental_history, history_retries, history_backoff
+from config import quote_url, quote_timeout, quote_workers, quote_requests_per_minute, quote_burst
+from config import quote_batch, quote_batch_size, quote_cache_ttl, quote_cache_path
 from modules.utils import log_error
+from modules.storage import write_frame, read_frame, read_frame_tail, frame_exists
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared between fetch threads.
+    Allows burst requests at once, then refills at 
+    rate tokens per second.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available and takes it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait)
+
+_session = None
+_limiter = None
+
+def get_limiter():
+    """
+    Returns the shared token bucket for the quote API quota.
+    """
+    global _limiter
+
+    if _limiter is None:
+        _limiter = TokenBucket(quote_requests_per_minute / 60, quote_burst)
+    
+    return _limiter
+
+def get_session():
+    """
+    Returns the shared pooled HTTP session for quote requests.
+    """
+    global _session
+    
+    if _session is None:
+        import requests
+
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections = 1, 
+                                                pool_maxsize = quote_workers)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    
+    return _session
+
+def quote_api_key(api_key = None):
+    """
+    Returns api_key, or the Alpha Vantage key from config
+    (Alpha_Key in project/secrets.py) when not given.
+    Raises LookupError without a key.
+    """
+    if api_key is not None:
+        return api_key
+
+    import config
+
+    try:
+        return config.api_key
+    except (ImportError, AttributeError) as e:
+        raise LookupError(f"No Alpha Vantage key, set Alpha_Key in {config.secrets_path}") from e
 
-def get_price(symbol):
+def quote_data(response):
+    """
+    JSON body of a quote response, raises on HTTP errors and on
+    Alpha Vantage's rate limit / error messages (sent with 200).
+    """
+    response.raise_for_status()
+    data = response.json()
+
+    for message in ("Note", "Information", "Error Message"):
+        if message in data:
+            raise RuntimeError(f"Alpha Vantage {message}: {data[message]}")
+
+    return data
+
+def get_price(symbol, session = None, url = quote_url, api_key = None):
     """
     pulls real-time prices form Alpha Vantage
     returns a price string or None if request fails
     logs error using lof_error()
+
+    api_key defaults to the key in config.
     
     """
-    
-    url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
+    import requests
+
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        price = data["Global Quote"]["05. price"]
+        params = {"function": "GLOBAL_QUOTE", "symbol": symbol, "apikey": quote_api_key(api_key)}
+        response = (session or requests).get(url, params = params, timeout = quote_timeout)
+        price = quote_data(response)["Global Quote"]["05. price"]
         return price
     except Exception as e:
          log_error(symbol, e)
          print(f"API call failed for {symbol}: {e}")
          return None
+
+def get_prices(symbols, workers = None, limiter = None, url = quote_url, api_key = None):
+    """
+    Fetches quotes for many symbols concurrently 
+    on the shared session.
+
+    Requests go out as fast as the token bucket allows
+    (config.quote_requests_per_minute / quote_burst).
+    Returns {symbol: price string or None} in symbols order,
+    all None (logged) without an API key.
     
-def get_historical_data(symbol):
+    """
+    workers = workers or quote_workers
+    limiter = limiter or get_limiter()
 
+    try:
+        api_key = quote_api_key(api_key)
+    except LookupError as e:
+        log_error("Quotes", e)
+        return {symbol: None for symbol in symbols}
+
+    session = get_session()
+
+    def fetch(symbol):
+        limiter.acquire()
+        return get_price(symbol, session = session, url = url, api_key = api_key)
+
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        prices = list(executor.map(fetch, symbols))
+
+    return dict(zip(symbols, prices))
+    
+def get_bulk_prices(symbols, limiter = None, url = quote_url, api_key = None):
     """
-    Uses yfinance
-    saves a CSV file to data folder
-    uses error handling if download fails
+    pulls real-time prices for many symbols in one call
+    (Alpha Vantage REALTIME_BULK_QUOTES, up to quote_batch_size 
+    symbols per request)
+    returns {symbol: price string or None}
     
     """
+    limiter = limiter or get_limiter()
+    prices = {symbol: None for symbol in symbols}
+
     try:
-        if fixed_data_range:
-            df = yf.download(symbol, start = start_date, end = end_date, 
-                            interval = interval,
-                            auto_adjust=True, progress = False,)
-        else:
-            df = yf.download(symbol, period = history_period, 
-                            interval = interval,
-                            auto_adjust=True, progress = False,)
+        api_key = quote_api_key(api_key)
+    except LookupError as e:
+        log_error("Quotes", e)
+        return prices
 
-       
-        if df is None or df.empty:
-            log_error("Get_Historical_Data", f"{symbol} - No data returned")
+    session = get_session()
+
+    for start in range(0, len(symbols), quote_batch_size):
+        batch = symbols[start:start + quote_batch_size]
+        params = {"function": "REALTIME_BULK_QUOTES", 
+                  "symbol": ",".join(batch), "apikey": api_key}
+        try:
+            limiter.acquire()
+            response = session.get(url, params = params, timeout = quote_timeout)
+            
+            for quote in quote_data(response)["data"]:
+                prices[quote["symbol"]] = quote["close"]
+        
+        except Exception as e:
+            log_error(",".join(batch), e)
+            print(f"Bulk API call failed for {', '.join(batch)}: {e}")
+
+    return {symbol: prices[symbol] for symbol in symbols}
+
+class QuoteProvider(ABC):
+    """
+    Quote provider interface.
+    get_quotes fetches many symbols, one get_quote call 
+    per symbol unless the provider supports batches.
+    """
+    
+    supports_batch = False
+
+    @abstractmethod
+    def get_quote(self, symbol):
+        """
+        Returns the latest price of symbol, None on failure.
+        """
+
+    def get_quotes(self, symbols):
+        return {symbol: self.get_quote(symbol) for symbol in symbols}
+
+class AlphaVantageProvider(QuoteProvider):
+    """
+    Alpha Vantage quotes: bulk endpoint when batch is on
+    (config.quote_batch), else concurrent GLOBAL_QUOTE calls.
+    api_key defaults to the key in config.
+    """
+
+    def __init__(self, batch = None, limiter = None, url = quote_url, api_key = None):
+        self.supports_batch = quote_batch if batch is None else batch
+        self.limiter = limiter
+        self.url = url
+        self.api_key = api_key
+
+    def get_quote(self, symbol):
+        return get_price(symbol, session = get_session(), url = self.url, api_key = self.api_key)
+
+    def get_quotes(self, symbols):
+        if self.supports_batch:
+            return get_bulk_prices(symbols, limiter = self.limiter, url = self.url,
+                                   api_key = self.api_key)
+        
+        return get_prices(symbols, limiter = self.limiter, url = self.url, api_key = self.api_key)
+
+class QuoteCache:
+    """
+    In-process + on-disk quote cache keyed by symbol.
+    Entries are fresh for ttl seconds; 
+    hits and misses are counted.
+    """
+
+    def __init__(self, ttl = quote_cache_ttl, path = quote_cache_path):
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.quotes = self.load()
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as file:
+                return {symbol: tuple(entry) for symbol, entry in json.load(file).items()}
+        except (OSError, ValueError) as e:
+            log_error("Quote_Cache", e)
+            return {}
+
+    def save(self):
+        if self.path is None:
             return
         
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.quotes, file)
+        os.replace(tmp_path, self.path)
+
+    def get(self, symbol):
+        """
+        Returns the cached price if still fresh, else None.
+        """
+        entry = self.quotes.get(symbol)
+        
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            self.hits += 1
+            return entry[1]
+        
+        self.misses += 1
+        return None
+
+    def put_many(self, prices):
+        """
+        Stores fetched prices (failed fetches are skipped) 
+        and writes the cache file.
+        """
+        now = time.time()
+        
+        for symbol, price in prices.items():
+            if price is not None:
+                self.quotes[symbol] = (now, price)
+        
+        self.save()
+
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total > 0 else 0
+        
+        return {"Hits": self.hits, "Misses": self.misses, "Hit Rate": hit_rate}
+
+class CachedQuoteProvider(QuoteProvider):
+    """
+    Serves fresh quotes from a QuoteCache and fetches 
+    only the misses from the wrapped provider, in one batch.
+    last_fetched holds the symbols the last call fetched.
+    """
+
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+        self.supports_batch = provider.supports_batch
+        self.last_fetched = set()
+
+    def get_quote(self, symbol):
+        return self.get_quotes([symbol])[symbol]
+
+    def get_quotes(self, symbols):
+        prices = {symbol: self.cache.get(symbol) for symbol in symbols}
+        missing = [symbol for symbol, price in prices.items() if price is None]
+        self.last_fetched = set(missing)
+
+        if missing:
+            fetched = self.provider.get_quotes(missing)
+            self.cache.put_many(fetched)
+            prices.update(fetched)
+
+        return prices
+
+_quote_provider = None
+
+def get_quote_provider():
+    """
+    Returns the shared cached Alpha Vantage quote provider.
+    """
+    global _quote_provider
+
+    if _quote_provider is None:
+        _quote_provider = CachedQuoteProvider(AlphaVantageProvider(), QuoteCache())
     
-        df["Symbol"] = symbol
-        df["Price"] = df["Close"]
-        df = df.reset_index()
-        df = df.rename(columns={"Date": "Timestamp"})
+    return _quote_provider
+
+def format_history(df, symbol):
+    """
+    Turns a yfinance download into the saved historical schema
+    (Timestamp/Datetime, Close, High, Low, Open, Volume, Symbol, Price)
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    df["Symbol"] = symbol
+    df["Price"] = df["Close"]
+    df = df.reset_index()
+    df = df.rename(columns={"Date": "Timestamp"})
+
+    return df
+
+def yf_downloader(symbol, start = None, end = None):
+    """
+    Default history downloader (yfinance).
+    Downloads start..end, or the configured window when not given.
+
+    Uses Ticker.history, which keeps its result per call and is
+    safe to run on several threads (yf.download is not).
+    """
+    import yfinance as yf
+
+    if start is None and not fixed_data_range:
+        df = yf.Ticker(symbol).history(period = history_period, interval = interval,
+                                       auto_adjust = True)
+    else:
+        df = yf.Ticker(symbol).history(start = start or start_date, end = end or end_date,
+                                       interval = interval, auto_adjust = True)
+
+    if df is None or df.empty:
+        return None
+
+    # same columns and timestamps as yf.download: UTC bars, plain dates for daily
+    df = df[["Close", "High", "Low", "Open", "Volume"]]
+    if interval == "1d":
+        df.index = df.index.tz_localize(None)
+    else:
+        df.index = df.index.tz_convert("UTC")
+
+    return format_history(df, symbol)
+
+def historical_path(symbol):
+    """
+    Path of the historical data file for the current interval.
+    """
+    #interval determines save folder
+
+    folder = "Hourly" if interval == "1h" else "Daily"
+    return historical_data_path.format(symbol = symbol).replace("project/data/", f"project/data/{folder}/")
+
+_yf_download_lock = threading.Lock()
+
+def yf_batch_downloader(symbols, start = None, end = None):
+    """
+    Multi-ticker history downloader (one yfinance call, yfinance
+    downloads the tickers in parallel, calls are serialised).
+    Returns {symbol: DataFrame in the saved schema}, 
+    symbols without data are left out.
+    """
+    import yfinance as yf
+
+    # yf.download keeps its results in module globals, one call at a time
+    with _yf_download_lock:
+        if start is None and not fixed_data_range:
+            df = yf.download(symbols, period = history_period, interval = interval,
+                            group_by = "ticker", auto_adjust=True, progress = False,)
+        else:
+            df = yf.download(symbols, start = start or start_date, end = end or end_date, 
+                            interval = interval, group_by = "ticker", 
+                            auto_adjust=True, progress = False,)
+
+    frames = {}
+    if df is None or df.empty:
+        return frames
+
+    for symbol in symbols:
+        if symbol not in df.columns.get_level_values(0):
+            continue
         
-        #interval determines save folder
+        df_symbol = df[symbol].dropna(how = "all")
+        if not df_symbol.empty:
+            frames[symbol] = format_history(df_symbol.copy(), symbol)
+
+    return frames
+
+def download_history(symbol, downloader = yf_downloader, frames = None):
+    """
+    Downloads the full window and saves it, raises on failure.
+    Returns the number of rows saved, the saved frame is also
+    put in frames[symbol] when a dict is given.
+    """
+    df = downloader(symbol)
+       
+    if df is None or df.empty:
+        raise LookupError("No data returned")
+    
+    write_frame(df, historical_path(symbol))
+
+    if frames is not None:
+        frames[symbol] = df
+    
+    return len(df)
+
+def get_historical_data(symbol, downloader = yf_downloader):
 
-        folder = "Hourly" if interval == "1h" else "Daily"
-        path = historical_data_path.format(symbol = symbol).replace("project/data/", f"project/data/{folder}/")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        df.to_csv(path, 
-                  index = False)
+    """
+    Uses yfinance
+    saves the data file (config.storage_format) to data folder
+    uses error handling if download fails
+    
+    """
+    try:
+        download_history(symbol, downloader)
     
     except Exception as e:
         log_error("Get_Historical_Data", f"{symbol} - {e}")
 
+def time_column(df):
+    return "Datetime" if "Datetime" in df.columns else "Timestamp"
+
+def find_history_gaps(times, max_gap = None):
+    """
+    Returns (start, end) pairs where consecutive stored 
+    timestamps are more than history_gap_days apart.
+    """
+    max_gap = max_gap or pd.Timedelta(days = history_gap_days)
+    times = times.sort_values().reset_index(drop = True)
+    
+    gaps = times.diff() > max_gap
+    
+    return list(zip(times.shift(1)[gaps], times[gaps]))
+
+def last_history_time(symbol):
+    """
+    Last stored timestamp of a symbol, None without a stored file.
+    """
+    path = historical_path(symbol)
+    
+    if not frame_exists(path):
+        return None
+    
+    df = read_frame_tail(path, 1)
+    
+    return pd.to_datetime(df[time_column(df)]).iloc[-1]
+
+def adjustment_changed(existing, df, column, tolerance = None):
+    """
+    True when a download's Close differs from the stored Close
+    on the bars both have (a split or dividend since the stored
+    rows were adjusted).
+    """
+    tolerance = history_adjust_tolerance if tolerance is None else tolerance
+    overlap = existing[[column, "Close"]].merge(df[[column, "Close"]], on = column,
+                                                suffixes = ("", " New"))
+
+    return bool(((overlap["Close New"] / overlap["Close"] - 1).abs() > tolerance).any())
+
+def merge_history(symbol, downloader = yf_downloader, frames = None):
+    """
+    Downloads the missing tail and gaps of a stored history 
+    and merges them in, raises on failure.
+
+    Downloads overlap the stored bars at their edges. When the
+    overlapping Close moved (auto_adjust changed after a split or
+    dividend) the stored rows are on an old basis, and the full
+    window is downloaded again instead.
+
+    Returns the number of new rows (rows saved after a full
+    download), the full history is also put in frames[symbol]
+    when a dict is given.
+    """
+    path = historical_path(symbol)
+    
+    if not frame_exists(path):
+        return download_history(symbol, downloader, frames)
+
+    existing = read_frame(path)
+    column = time_column(existing)
+    existing[column] = pd.to_datetime(existing[column])
+    times = existing[column]
+
+    ranges = [(times.max(), None)]
+    ranges += [(gap_start, gap_end + pd.Timedelta(days = 1)) 
+               for gap_start, gap_end in find_history_gaps(times)]
+
+    downloads = []
+    for start, end in ranges:
+        end = end.strftime("%Y-%m-%d") if end is not None else None
+        df = downloader(symbol, start = start.strftime("%Y-%m-%d"), end = end)
+        
+        if df is not None and not df.empty:
+            df = df.rename(columns = {time_column(df): column})
+            df[column] = pd.to_datetime(df[column])
+            
+            # match the stored timezone handling
+            if times.dt.tz is not None:
+                df[column] = (df[column].dt.tz_convert("UTC") if df[column].dt.tz is not None 
+                              else df[column].dt.tz_localize("UTC"))
+            elif df[column].dt.tz is not None:
+                df[column] = df[column].dt.tz_localize(None)
+
+            if adjustment_changed(existing, df, column):
+                return download_history(symbol, downloader, frames)
+
+            downloads.append(df[existing.columns])
+
+    if not downloads:
+        if frames is not None:
+            frames[symbol] = existing
+        return 0
+
+    merged = pd.concat([existing] + downloads, ignore_index = True)
+    merged = merged.drop_duplicates(subset = column, keep = "last")
+    merged = merged.sort_values(column).reset_index(drop = True)
+
+    write_frame(merged, path)
+
+    if frames is not None:
+        frames[symbol] = merged
+    
+    return len(merged) - len(existing)
+
+def sync_historical_data(symbol, downloader = yf_downloader):
+
+    """
+    Incremental version of get_historical_data.
+
+    Reads the stored file, downloads only the missing tail
+    (from the last stored timestamp to end_date) and any gaps 
+    in the middle of the history, merges and de-duplicates on 
+    timestamp, then writes the file atomically.
+    Downloads the full window when there is no stored file or
+    the stored rows are on an old split / dividend adjustment.
+
+    downloader(symbol, start, end) returns a DataFrame in the 
+    saved schema or None, so the sync can run offline.
+
+    Returns the number of new rows.
+    
+    """
+    try:
+        return merge_history(symbol, downloader)
+
+    except Exception as e:
+        log_error("Sync_Historical_Data", f"{symbol} - {e}")
+        return 0
+
+def prefetched_downloader(frames, downloader = yf_downloader, window_start = None):
+    """
+    Wraps a multi-ticker download as a per-symbol downloader:
+    tail / full window requests are served from frames when
+    they start at or after window_start (the prefetch start,
+    None = full window), gap backfills, earlier starts and 
+    missing symbols fall back to downloader.
+    """
+    def download(symbol, start = None, end = None):
+        covered = window_start is None or (start is not None and start >= window_start)
+        if end is None and symbol in frames and covered:
+            return frames[symbol]
+        return downloader(symbol, start = start, end = end)
+    
+    return download
+
+def with_retries(func, retries, backoff):
+    """
+    Calls func, retrying up to retries times on errors and 
+    waiting backoff seconds doubled on each attempt.
+    LookupError (no data) is not retried.
+    Returns (result, attempts, error).
+    """
+    for attempt in range(1, retries + 2):
+        try:
+            return func(), attempt, None
+        
+        except LookupError as e:
+            return None, attempt, e
+        
+        except Exception as e:
+            if attempt > retries:
+                return None, attempt, e
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+def bulk_historical_data(symbols, workers = None, batch_size = None, incremental = None,
+                         retries = None, backoff = None,
+                         downloader = yf_downloader, batch_downloader = yf_batch_downloader,
+                         frames = None):
+    """
+    Downloads history for many symbols on a bounded thread pool.
+
+    Symbols are grouped into batches of batch_size, each batch
+    is prefetched with one multi-ticker request when > 1 and 
+    split into the per-symbol files. Failed requests are retried 
+    up to retries times, waiting backoff seconds doubled on 
+    each attempt.
+
+    Returns one status dict per symbol, in symbols order:
+    Symbol, Status, Rows, Attempts, Seconds, Error.
+    The saved histories are put in frames when a dict is given.
+    """
+    workers = workers or history_workers
+    batch_size = batch_size or history_batch_size
+    incremental = incremental_history if incremental is None else incremental
+    retries = history_retries if retries is None else retries
+    backoff = history_backoff if backoff is None else backoff
+
+    save = merge_history if incremental else download_history
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+    def prefetch_start(batch):
+        starts = [last_history_time(symbol) for symbol in batch] if incremental else [None]
+        return None if None in starts else min(starts).strftime("%Y-%m-%d")
+
+    def run_batch(batch):
+        batch_start = time.perf_counter()
+        batch_symbol_downloader = downloader
+        
+        if len(batch) > 1:
+            start = prefetch_start(batch)
+            prefetched, _, error = with_retries(lambda: batch_downloader(batch, start = start),
+                                                retries, backoff)
+            
+            # symbols missing from a failed batch fall back to single downloads
+            if error is None:
+                batch_symbol_downloader = prefetched_downloader(prefetched, downloader, start)
+
+        prefetch_seconds = time.perf_counter() - batch_start
+        statuses = []
+
+        for symbol in batch:
+            start = time.perf_counter()
+            rows, attempts, error = with_retries(
+                lambda: save(symbol, batch_symbol_downloader, frames), retries, backoff)
+            
+            if error is None:
+                status = "ok"
+            else:
+                status = "no data" if isinstance(error, LookupError) else "failed"
+                log_error("Get_Historical_Data", f"{symbol} - {error}")
+
+            statuses.append({
+                "Symbol": symbol, 
+                "Status": status, 
+                "Rows": rows or 0, 
+                "Attempts": attempts, 
+                "Seconds": time.perf_counter() - start + prefetch_seconds / len(batch), 
+                "Error": "" if error is None else str(error)
+            })
+
+        return statuses
 
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        results = list(executor.map(run_batch, batches))
 
- 
\ No newline at end of file
+    return [status for batch_status in results for status in batch_status]
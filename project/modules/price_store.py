@@ -0,0 +1,150 @@
+"""
+Memory-mapped price store for the whole symbol universe.
+
+Layout in price_store_dir:
+- prices.f64: float64 matrix, one row per bar, STORE_COLUMNS
+- times.i64: int64 timestamps (ns since epoch), one per bar
+- index.json: columns, timezone and the [start, stop) rows of each symbol
+
+Files are opened with numpy.memmap, so processes share one
+page-cached copy of the data without parsing anything.
+
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import symbols, price_store_dir
+from modules.backtest import backtest_arrays
+from modules.price_fetcher import historical_path
+from modules.storage import read_frame
+from modules.strategy import strategy_positions
+
+STORE_COLUMNS = ["Open", "High", "Low", "Close", "Price"]
+
+def build_price_store(store_symbols = None, path = None):
+    """
+    Writes the historical data of every symbol
+    (current interval) into the price store.
+    """
+    store_symbols = store_symbols or symbols
+    path = path or price_store_dir
+    os.makedirs(path, exist_ok = True)
+
+    frames = []
+    index = {"columns": STORE_COLUMNS, "tz": None, "symbols": {}}
+    rows = 0
+
+    for symbol in store_symbols:
+        df = read_frame(historical_path(symbol))
+        column = "Datetime" if "Datetime" in df.columns else "Timestamp"
+        times = pd.to_datetime(df[column])
+
+        if times.dt.tz is not None:
+            index["tz"] = "UTC"
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+
+        frames.append((df[STORE_COLUMNS].to_numpy(dtype = np.float64),
+                       times.to_numpy(dtype = "datetime64[ns]").view(np.int64)))
+        index["symbols"][symbol] = [rows, rows + len(df)]
+        rows += len(df)
+
+    index["rows"] = rows
+
+    # write to temp files and swap in, so open readers keep a consistent copy
+    for name, part in (("prices.f64", 0), ("times.i64", 1)):
+        tmp_path = os.path.join(path, name + ".tmp")
+        with open(tmp_path, "wb") as file:
+            for frame in frames:
+                frame[part].tofile(file)
+        os.replace(tmp_path, os.path.join(path, name))
+
+    tmp_path = os.path.join(path, "index.json.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(index, file)
+    os.replace(tmp_path, os.path.join(path, "index.json"))
+
+    print(f"Price store built: {len(store_symbols)} symbols, {rows} rows in {path}")
+
+class TimeLabels:
+    """
+    Formats int64 store timestamps like the CSV files,
+    only for the bars that are looked up (trade log entries).
+    """
+
+    def __init__(self, times, tz):
+        self.times = times
+        self.tz = tz
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, index):
+        timestamp = pd.Timestamp(int(self.times[index]), tz = self.tz)
+
+        if self.tz is None and timestamp == timestamp.normalize():
+            return timestamp.strftime("%Y-%m-%d")
+
+        return str(timestamp)
+
+class PriceStore:
+    """
+    Read-only view of a price store.
+    Per-symbol arrays are slices of the shared memory maps.
+    """
+
+    def __init__(self, path = None):
+        path = path or price_store_dir
+
+        with open(os.path.join(path, "index.json"), "r") as file:
+            index = json.load(file)
+
+        self.columns = index["columns"]
+        self.tz = index["tz"]
+        self.index = index["symbols"]
+        self.symbols = list(self.index)
+
+        self.matrix = np.memmap(os.path.join(path, "prices.f64"), dtype = np.float64,
+                                mode = "r", shape = (index["rows"], len(self.columns)))
+        self.times = np.memmap(os.path.join(path, "times.i64"), dtype = np.int64,
+                               mode = "r", shape = (index["rows"],))
+
+    def prices(self, symbol, column = "Price"):
+        start, stop = self.index[symbol]
+        return self.matrix[start:stop, self.columns.index(column)]
+
+    def timestamps(self, symbol):
+        start, stop = self.index[symbol]
+        return self.times[start:stop]
+
+    def time_labels(self, symbol):
+        return TimeLabels(self.timestamps(symbol), self.tz)
+
+_store = None
+
+def open_price_store():
+    """
+    Returns the price store of this process (opened once).
+    """
+    global _store
+
+    if _store is None:
+        _store = PriceStore()
+
+    return _store
+
+def backtest_store_symbol(symbol, balance, store = None, curves = None, log_format = "records"):
+    """
+    Runs the configured MA strategy and the vectorized
+    backtest directly on one symbol's memory-mapped arrays.
+    curves and log_format are passed on to backtest_arrays.
+    """
+    store = store or open_price_store()
+    prices = store.prices(symbol)
+    positions = strategy_positions(prices)
+
+    return backtest_arrays(prices, positions, store.time_labels(symbol), symbol, balance,
+                          curves = curves, log_format = log_format)
@@ -0,0 +1,165 @@
+"""
+On-disk cache of per-symbol backtest outputs.
+
+Keys hash the input data fingerprint (file mtime and size,
+or a hash of the contents), the strategy, cost and risk
+config, the engine and ENGINE_VERSION. Values are pickles
+of (results, trade_log, curves) in result_cache_dir.
+
+The folder is kept under result_cache_max_mb by evicting
+the least recently used entries (file mtime is touched
+on every hit). Its size is scanned once and then tracked
+in memory, the folder is only listed again to evict.
+
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+from config import (stop_loss, take_profit, risk_per_trade, fixed_fee, percentage_fee,
+    slippage, Fast_MA, Slow_MA, interval, result_cache_dir, result_cache_max_mb,
+    result_cache_fingerprint)
+from modules.backtest import ENGINE_VERSION
+from modules.utils import log_error
+
+def file_fingerprint(path, mode = None):
+    """
+    Fingerprint of a data file: "stat" uses mtime and size,
+    "content" a SHA-256 of the bytes.
+    """
+    mode = mode or result_cache_fingerprint
+
+    if mode == "content":
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of backtest outputs,
+    hits and misses are counted.
+    """
+
+    def __init__(self, path = result_cache_dir, max_mb = result_cache_max_mb):
+        self.path = path
+        self.max_bytes = max_mb * 2**20
+        self.hits = 0
+        self.misses = 0
+        self.size = None
+        os.makedirs(path, exist_ok = True)
+
+    def key(self, input_paths, **params):
+        """
+        Builds the cache key of a backtest run from the files it
+        reads and its parameters (config values are always included).
+        """
+        params.update({
+            "stop_loss": stop_loss, "take_profit": take_profit,
+            "risk_per_trade": risk_per_trade, "fixed_fee": fixed_fee,
+            "percentage_fee": percentage_fee, "slippage": slippage,
+            "Fast_MA": Fast_MA, "Slow_MA": Slow_MA, "interval": interval,
+            "engine_version": ENGINE_VERSION,
+            "inputs": {path: file_fingerprint(path) for path in input_paths},
+        })
+
+        return hashlib.sha256(json.dumps(params, sort_keys = True).encode()).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.path, key + ".pkl")
+
+    def get(self, key):
+        """
+        Returns the cached value or None.
+        """
+        path = self.entry_path(key)
+
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            log_error("Result_Cache", e)
+            self.misses += 1
+            return None
+
+        # mark as recently used
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a value and evicts the least recently
+        used entries past the size limit.
+        """
+        path = self.entry_path(key)
+        tmp_path = path + ".tmp"
+
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self.entries())
+
+        with open(tmp_path, "wb") as file:
+            pickle.dump(value, file, protocol = pickle.HIGHEST_PROTOCOL)
+
+        replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        self.size += os.path.getsize(tmp_path) - replaced
+        os.replace(tmp_path, path)
+
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        """
+        (mtime ns, size, name) of every cached entry.
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".pkl"):
+                stat = os.stat(os.path.join(self.path, name))
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+
+        return entries
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the
+        folder is under the size limit.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.path, name))
+            total -= size
+
+        self.size = total
+
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total > 0 else 0
+
+        return {"Hits": self.hits, "Misses": self.misses, "Hit Rate": hit_rate}
+
+_result_cache = None
+
+def get_result_cache():
+    """
+    Returns the backtest result cache of this process.
+    """
+    global _result_cache
+
+    if _result_cache is None:
+        _result_cache = ResultCache()
+
+    return _result_cache
@@ -12,146 +12,568 @@ calling all pipeline steps and saving results/logs to file.
 """
 
 from modules.indicators import add_ma, add_percent_change, add_trend
-from modules.strategy import generate_signals, add_position
-from config import symbols, buy_threshold, sleep_time, wallet_balance, interval
-from modules.backtest import backtest_signals
-from modules.price_fetcher import get_price, get_historical_data
-from modules.utils import save_price
-from config import (analysis_path, run_log_path, 
+from modules.strategy import generate_signals, add_position, carry_forward, StreamingStrategy
+from config import symbols, wallet_balance, interval
+from config import backtest_engine, backtest_workers, backtest_source
+from config import incremental_analysis, analysis_warmup_rows, price_store_dir, result_cache
+from config import tick_store, live_bars, strategy_state_path, live_bars_path, live_bars_in_analysis
+from modules.backtest import backtest_signals, BACKTEST_COLUMNS
+from modules.trade_store import TRADE_LOG_COLUMNS
+from modules.price_fetcher import get_quote_provider, bulk_historical_data, historical_path
+from modules.utils import save_price, write_log, log_error
+from modules.price_store import backtest_store_symbol
+from modules.storage import (read_frame, read_frame_tail, write_frame, append_frame, 
+    frame_exists, storage_path, analysis_file)
+from modules.result_cache import get_result_cache
+from modules.bars import update_live_bars
+from config import (run_log_path, 
 historical_data_path, trade_log_path, profit_summary_csv, profit_summary_txt)
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import pandas as pd
-import time
 import os
+import pickle
 
-def run_backtests():
+def backtest_inputs(symbol):
+    """
+    Files a symbol's backtest reads (used for cache keys).
+    """
+    if backtest_source == "store":
+        return [os.path.join(price_store_dir, name) 
+                for name in ("index.json", "prices.f64", "times.i64")]
+
+    return [storage_path(analysis_file(symbol))]
+
+def compute_backtest(symbol, balance, with_curves = False):
+    """
+    Backtests one symbol from its analysis file, or from the 
+    memory-mapped price store when config.backtest_source is "store".
+
+    Returns (results, trade_log, curves), trade_log is a DataFrame
+    (TradeStore.to_trade_log), curves is None unless with_curves 
+    is set (vectorized engine / store only).
+    Module level so it can run inside a worker process.
+    
+    """
+
+    curves = {} if with_curves else None
+    
+    if backtest_source == "store":
+        results, trade_log = backtest_store_symbol(symbol, balance, curves = curves,
+                                                   log_format = "frame")
+    else:
+        df = read_frame(analysis_file(symbol), columns = BACKTEST_COLUMNS)
+        results, trade_log = backtest_signals(df, balance = balance, engine = backtest_engine, 
+                                              curves = curves, log_format = "frame")
+    
+    return results, trade_log, curves
+
+def trade_file(symbol, extension):
+    return f"project/logs/trade_{symbol}.{extension}"
+
+def write_trade_files(symbol, trade_log, curves, key = None):
+    """
+    Writes the trade_log frame to project/logs/trade_{symbol}.csv,
+    and the equity curves in trade_{symbol}.npz next to it when there are any.
+
+    key (the result cache key of the backtest) is saved in
+    trade_{symbol}.key, written last, so trade_files_current
+    can tell the files already hold that backtest.
+    """
+    if os.path.exists(trade_file(symbol, "key")):
+        os.remove(trade_file(symbol, "key"))
+
+    trade_log.to_csv(trade_file(symbol, "csv"), index = False)
+
+    if curves is not None:
+        np.savez_compressed(trade_file(symbol, "npz"), **curves)
+
+    if key is not None:
+        with open(trade_file(symbol, "key"), "w") as file:
+            file.write(key)
+
+def trade_files_current(symbol, key, with_curves):
+    """
+    True when the trade files of symbol were written from the
+    backtest with this result cache key.
+    """
+    try:
+        with open(trade_file(symbol, "key"), "r") as file:
+            saved = file.read()
+    except FileNotFoundError:
+        return False
+
+    return (saved == key and os.path.exists(trade_file(symbol, "csv"))
+            and (not with_curves or os.path.exists(trade_file(symbol, "npz"))))
+
+def combine_trade_logs(trade_logs):
+    """
+    One DataFrame of several trade_log frames.
+    """
+    trade_logs = [trade_log for trade_log in trade_logs if len(trade_log)]
+
+    if not trade_logs:
+        return pd.DataFrame(columns = TRADE_LOG_COLUMNS)
+
+    return pd.concat(trade_logs, ignore_index = True)
+
+def backtest_symbol(symbol, balance, with_curves = False, write_trades = True, key = None):
+    """
+    Backtests one symbol (compute_backtest) and writes its
+    trade files when write_trades is set, in the worker
+    process when run in a pool (key as in write_trade_files).
+
+    Returns (results, trade_log, curves).
+    
+    """
+
+    results, trade_log, curves = compute_backtest(symbol, balance, with_curves)
+    
+    if write_trades:
+        write_trade_files(symbol, trade_log, curves, key)
+    
+    return results, trade_log, curves
+
+def backtest_all_symbols(workers = None, write_trades = True, use_cache = None):
+    """
+    Backtests every symbol, in a process pool 
+    when workers > 1.
+
+    Symbols whose inputs and config did not change since a 
+    cached run come from the result cache (config.result_cache).
+    Trade files are written by the workers. A cached symbol's
+    files are only rewritten when they do not hold that cached
+    backtest (trade_files_current), and no pool is started
+    when every symbol is cached.
+
+    Returns a list of (symbol, results, trade_log frame) 
+    in the same order as config.symbols.
+    
+    """
+
+    workers = backtest_workers if workers is None else workers
+    use_cache = result_cache if use_cache is None else use_cache
+    per_stock_balance = wallet_balance / len(symbols)
+    with_curves = write_trades and (backtest_source == "store" or backtest_engine != "loop")
+
+    outputs = {}
+    keys = {}
+
+    if use_cache:
+        cache = get_result_cache()
+        hits, misses = cache.hits, cache.misses
+        
+        for symbol in symbols:
+            keys[symbol] = cache.key(backtest_inputs(symbol), symbol = symbol, 
+                                     balance = per_stock_balance, engine = backtest_engine,
+                                     source = backtest_source, curves = with_curves)
+            cached = cache.get(keys[symbol])
+            if cached is not None:
+                outputs[symbol] = cached
+
+    missing = [symbol for symbol in symbols if symbol not in outputs]
+    stale = [symbol for symbol in outputs 
+             if write_trades and not trade_files_current(symbol, keys[symbol], with_curves)]
+
+    balances = [per_stock_balance] * len(missing)
+    flags = [with_curves] * len(missing)
+    writes = [write_trades] * len(missing)
+    missing_keys = [keys.get(symbol) for symbol in missing]
+    stale_args = ([outputs[symbol][1] for symbol in stale], [outputs[symbol][2] for symbol in stale],
+                  [keys[symbol] for symbol in stale])
+
+    if workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            written = executor.map(write_trade_files, stale, *stale_args)
+            computed = list(executor.map(backtest_symbol, missing, balances, flags, writes,
+                                         missing_keys))
+            list(written)
+    else:
+        list(map(write_trade_files, stale, *stale_args))
+        computed = list(map(backtest_symbol, missing, balances, flags, writes, missing_keys))
+
+    for symbol, output in zip(missing, computed):
+        outputs[symbol] = output
+        if use_cache:
+            cache.put(keys[symbol], output)
+
+    if use_cache:
+        hits, misses = cache.hits - hits, cache.misses - misses
+        print(f"Result cache: {hits} hits, {misses} misses "
+              f"({hits / len(symbols) * 100:.0f}% of backtests reused)")
+
+    return [(symbol, outputs[symbol][0], outputs[symbol][1]) for symbol in symbols]
+
+def print_backtest_results(symbol, results):
+    """
+    Prints summary stats for one symbol's backtest.
+    """
+
+    print(f"Backtest for {symbol}:")
+    print(f"Total Trades: {results['Total Trades']}")
+    print(f"Win Rate: {results['Win Rate']:.2f}%")
+    print(f"Wins:{results['Wins']}")
+    print(f"Average Win: {results['Average Win']:.2f}")
+    print(f"Losses: {results['Losses']}")
+    print(f"Average Loss: {results['Average Loss']:.2f}")
+    print(f"Expectancy: {results['expectancy']}")
+    print(f"Long Trades: {results['Long Trades']}")
+    print(f"Short Trades: {results['Short Trades']}")
+    print(f"Total Profit: £{results['Total Profit']:.2f}")
+
+    if "Max Drawdown" in results:
+        print(f"Max Drawdown: {results['Max Drawdown']:.2f}%")
+        print(f"Sharpe: {results['Sharpe']:.2f}")
+        print(f"Sortino: {results['Sortino']:.2f}")
+        print(f"Exposure: {results['Exposure']:.2f}%")
+        print(f"Profit Factor: {results['Profit Factor']:.2f}")
+
+    print()
+    print()
+
+def run_backtests(workers = None):
     """
     Runs backtests on all analyzed symbols.
     
     Prints summary stats for each symbol 
     (trades, win rate, P&L).
 
+    workers > 1 spreads symbols over a process pool 
+    (defaults to config.backtest_workers).
+
     """
     
     symbol_trade_count = {}
 
-    for symbol in symbols:
-        per_stock_balance = wallet_balance / len(symbols)
-        
-        df = pd.read_csv(analysis_path.format(symbol = symbol))
-        #print(df[["Timestamp", "Signal", "Position"]].head(30))
-        
-        print(f"Backtest for {symbol}:")
-        results, trade_log = backtest_signals(df, balance = per_stock_balance) 
-        print(f"Total Trades: {results['Total Trades']}")
-        print(f"Win Rate: {results['Win Rate']:.2f}%")
-        print(f"Wins:{results['Wins']}")
-        print(f"Average Win: {results['Average Win']:.2f}")
-        print(f"Losses: {results['Losses']}")
-        print(f"Average Loss: {results['Average Loss']:.2f}")
-        print(f"Expectancy: {results['expectancy']}")
-        print(f"Long Trades: {results['Long Trades']}")
-        print(f"Short Trades: {results['Short Trades']}")
-        print(f"Total Profit: £{results['Total Profit']:.2f}\n")
-        df_trade_log = pd.DataFrame(trade_log)
-        df_trade_log.to_csv(f"project/logs/trade_{symbol}.csv", index = False)
+    for symbol, results, trade_log in backtest_all_symbols(workers):
+        print_backtest_results(symbol, results)
         symbol_trade_count[symbol] = results['Total Trades']
-        print()
+
+def run_backtest_pipeline(workers = None):
+    """
+    Runs the backtest once for every symbol and reuses it 
+    in memory for all outputs:
+    - per-symbol stats and trade_{symbol}.csv (as run_backtests)
+    - the combined trade_log_path CSV (as export_all_trades)
+    - the profit summary (as profit_summary)
+
+    Returns the (symbol, results, trade_log) list.
+    """
+
+    outputs = backtest_all_symbols(workers)
+
+    for symbol, results, trade_log in outputs:
+        print_backtest_results(symbol, results)
+
+    df_all_trade = combine_trade_logs(trade_log for _, _, trade_log in outputs)
+    df_all_trade.to_csv(trade_log_path, index = False)
+    
+    profit_summary(df_all_trade)
+
+    return outputs
+
+def live_strategy(symbol):
+    """
+    Builds a StreamingStrategy for one symbol, warmed up
+    with the last slow-window prices of its historical file
+    (only for symbols without a saved live state).
+
+    """
+
+    strategy = StreamingStrategy()
+    hist_path = historical_path(symbol)
+
+    if frame_exists(hist_path):
+        strategy.warm_up(read_frame_tail(hist_path, strategy.slow_window)["Price"].tolist())
+
+    return strategy
+
+def load_live_strategies():
+    """
+    Streaming strategies saved by the last run_predictor,
+    {symbol: StreamingStrategy}. Empty when there are none
+    or the MA windows changed since.
+    """
+
+    if not os.path.exists(strategy_state_path):
+        return {}
+
+    try:
+        with open(strategy_state_path, "rb") as file:
+            windows, strategies = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+        log_error("Strategy_State", e)
+        return {}
+
+    fresh = StreamingStrategy()
+    if windows != (fresh.fast_window, fresh.slow_window):
+        return {}
+
+    return strategies
+
+def save_live_strategies(strategies):
+    """
+    Saves the streaming strategies for the next run_predictor.
+    """
+
+    fresh = StreamingStrategy()
+    tmp_path = strategy_state_path + ".tmp"
+
+    with open(tmp_path, "wb") as file:
+        pickle.dump(((fresh.fast_window, fresh.slow_window), strategies), file,
+                    protocol = pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, strategy_state_path)
 
 def run_predictor():
      """
      Runs the live stock predictor loop.
-     Fetches latest prices, 
-     
-     prints/saves buy signals, and logs run summary.
+     Fetches latest prices through the cached quote provider, 
+     feeds them to the streaming MA strategy (same signals as
+     the backtest), prints/saves buy signals, and logs run summary.
+
+     Strategy state is kept between runs (strategy_state_path),
+     each freshly fetched quote is one O(1) update, cached
+     quotes were already fed on the run that fetched them.
      
      """
      
      start_time = datetime.now()
      
-     with open(run_log_path, "a") as file:
-         file.write(f"[{datetime.now()}] Stock predictor run started. \n")
+     write_log(run_log_path, f"[{datetime.now()}] Stock predictor run started. \n")
      
      buy_signal = 0
 
-     for symbol in symbols:
-    
-        price = get_price(symbol)
+     quote_provider = get_quote_provider()
+     prices = quote_provider.get_quotes(symbols)
+     strategies = load_live_strategies()
+
+     for symbol, price in prices.items():
 
         if price is None:
             continue
 
-        if float(price) >buy_threshold:
+        if symbol not in strategies:
+            strategies[symbol] = live_strategy(symbol)
+
+        # cached quotes were already fed and logged when they were fetched
+        if symbol in quote_provider.last_fetched:
+            strategies[symbol].update(float(price))
+            save_price(symbol, price)
+
+        if strategies[symbol].position == 1:
             print(f"Buy signal for {symbol}! Price: {price}")
             buy_signal += 1
         else:
             print(f"No buy signal for {symbol}. Price: {price}")
-    
-        save_price(symbol, price)
 
-        time.sleep(sleep_time)
+     save_live_strategies(strategies)
 
      print(f"Run complete. {len(symbols)} symbols processed. {buy_signal} buy signals")
+     
+     if tick_store and live_bars:
+        print(f"Live bars: {update_live_bars()} closed bars written")
+
+     cache_stats = quote_provider.cache.stats()
+     print(f"Quote cache: {cache_stats['Hits']} hits, {cache_stats['Misses']} misses "
+           f"({cache_stats['Hit Rate']:.0f}% of API calls saved)")
 
-     with open(run_log_path, "a") as file:
-         file.write(f"[{datetime.now()}] Run complete. {len(symbols)} symbols processed. {buy_signal} buy signals \n")
+     write_log(run_log_path, f"[{datetime.now()}] Run complete. {len(symbols)} symbols processed. {buy_signal} buy signals \n")
 
      end_time = datetime.now()
 
      duration = end_time - start_time
-     with open(run_log_path, "a") as file:
-         file.write(f"Run duration: {duration.total_seconds()} seconds \n")
-     
-     with open(run_log_path, "a") as file:
-         file.write(f"[{datetime.now()}] Run complete. {len(symbols)} symbols processed. {buy_signal} buy signals. Run duration: {duration.total_seconds()} seconds \n ")
+     write_log(run_log_path, f"Run duration: {duration.total_seconds()} seconds \n")
+     write_log(run_log_path, f"[{datetime.now()}] Run complete. {len(symbols)} symbols processed. {buy_signal} buy signals. Run duration: {duration.total_seconds()} seconds \n ")
+
+def load_historical(hist_path, rows = None):
+    """
+    Loads a historical prices file (all rows, or only the last rows)
+    with a datetime Timestamp column.
+    
+    """
+    
+    if rows is None:
+        df_symbol = read_frame(hist_path)
+    else:
+        df_symbol = read_frame_tail(hist_path, rows)
+
+    return history_frame(df_symbol)
+
+def history_frame(df_symbol):
+    """
+    Historical prices with a datetime Timestamp column
+    (files and downloads may use Datetime / strings).
+    """
+
+    # Rename Datetime to Timestamp if it exists
+    if "Datetime" in df_symbol.columns:
+        df_symbol = df_symbol.rename(columns={"Datetime": "Timestamp"})
+
+    # Ensure Timestamp is datetime type
+    if not pd.api.types.is_datetime64_any_dtype(df_symbol["Timestamp"]):
+        df_symbol["Timestamp"] = pd.to_datetime(df_symbol["Timestamp"])
+
+    return df_symbol.reset_index(drop=True)
+
+def with_live_bars(df_hist, live_path):
+    """
+    Appends the live bars (modules.bars) newer than the
+    last historical bar, df_hist as is without a live file.
+    """
+
+    if live_path is None or not frame_exists(live_path):
+        return df_hist
+
+    df_live = load_historical(live_path)
+
+    if df_hist["Timestamp"].dt.tz is not None:
+        df_live["Timestamp"] = df_live["Timestamp"].dt.tz_convert(df_hist["Timestamp"].dt.tz)
+
+    if not df_hist.empty:
+        df_live = df_live[df_live["Timestamp"] > df_hist["Timestamp"].iloc[-1]]
+
+    if df_live.empty:
+        return df_hist
+
+    return pd.concat([df_hist, df_live[df_hist.columns]], ignore_index = True)
 
-def prepare_analysis():
+def add_analysis_columns(df_symbol):
+    """
+    Adds indicators, signals and positions to historical prices.
+    """
+
+    df_symbol = add_ma(df_symbol, 10)
+    df_symbol = add_ma(df_symbol, 50)
+    df_symbol = add_percent_change(df_symbol)
+    df_symbol = add_trend(df_symbol, "MA50")
+    df_symbol = generate_signals(df_symbol)
+    df_symbol = add_position(df_symbol)
+
+    return df_symbol
+
+def update_analysis(hist_path, output_path, history = None, existing = None, live_path = None):
+    """
+    Appends analysis rows for bars in hist_path 
+    newer than the last row of output_path.
+
+    Only the tail of both files is read: the last 
+    analysis_warmup_rows analysed bars give the MA/trend 
+    warm-up and the last position, so the cost grows with 
+    the number of new bars, not the history.
+
+    history (historical prices) and existing (the stored 
+    analysis) skip the reads when already in memory. Live bars
+    in live_path newer than the history are analysed too.
+
+    Returns the appended rows, None without stored analysis.
+    """
+
+    if existing is None:
+        df_tail = read_frame_tail(output_path, analysis_warmup_rows)
+    else:
+        df_tail = existing.tail(analysis_warmup_rows).reset_index(drop = True)
+
+    if df_tail.empty:
+        return None
+    
+    last_time = pd.to_datetime(df_tail["Timestamp"]).iloc[-1]
+    last_position = df_tail["Position"].iloc[-1]
+
+    if history is not None:
+        df_hist = history
+    else:
+        # grow the historical tail until it reaches the last analysed bar
+        rows = 64
+        while True:
+            df_hist = load_historical(hist_path, rows)
+            if len(df_hist) < rows or df_hist["Timestamp"].iloc[0] <= last_time:
+                break
+            rows *= 4
+
+    df_hist = with_live_bars(df_hist, live_path)
+    
+    df_new = df_hist[df_hist["Timestamp"] > last_time]
+    if df_new.empty:
+        return df_tail.iloc[:0]
+    
+    df_tail["Timestamp"] = pd.to_datetime(df_tail["Timestamp"])
+    context = pd.concat([df_tail[df_new.columns], df_new], ignore_index = True)
+    context = add_analysis_columns(context)
+
+    df_added = context.iloc[len(df_tail):].copy()
+    
+    # seed the carried position with the last stored one
+    signals = pd.concat([pd.Series([last_position]), df_added["Signal"]], ignore_index = True)
+    df_added["Position"] = carry_forward(signals).iloc[1:].to_numpy()
+
+    df_added = df_added[df_tail.columns]
+    append_frame(df_added, output_path)
+    
+    return df_added
+
+def prepare_analysis(incremental = None, history = None, keep = False):
     """
     Prepares analysis data for each symbol.
     Loads historical data, 
     
     adds technical features/signals, and saves results.
+
+    incremental (defaults to config.incremental_analysis) only 
+    processes bars newer than the existing analysis file 
+    and appends them.
+
+    history {symbol: historical prices} is used instead of the
+    historical files when given. Live bars newer than the
+    history are appended when live_bars_in_analysis is set.
+    With keep, returns the full analysis frames {symbol: DataFrame}.
     
     """
-    folder = "Hourly" if interval == "1h" else "Daily"
-    analysis_folder = "Analysis_Hourly" if interval == "1h" else "Analysis_Daily"
+    incremental = incremental_analysis if incremental is None else incremental
+    history = history or {}
+    frames = {}
 
     for symbol in symbols:
        
         # Load historical data from correct folder
        
-        hist_path = f"project/data/{folder}/historical_prices-{symbol}.csv"
-        df_symbol = pd.read_csv(hist_path)
-
-        # Rename Datetime to Timestamp if it exists
-        if "Datetime" in df_symbol.columns:
-            df_symbol = df_symbol.rename(columns={"Datetime": "Timestamp"})
-
-        # Ensure Timestamp is datetime type
-        if not pd.api.types.is_datetime64_any_dtype(df_symbol["Timestamp"]):
-            df_symbol["Timestamp"] = pd.to_datetime(df_symbol["Timestamp"])
-
-        df_symbol = df_symbol.reset_index(drop=True)
+        hist_path = historical_path(symbol)
+        output_path = analysis_file(symbol)
+        live_path = live_bars_path.format(interval = interval, symbol = symbol) if live_bars_in_analysis else None
+        df_history = history_frame(history[symbol].copy()) if symbol in history else None
+
+        if incremental and frame_exists(output_path):
+            existing = read_frame(output_path) if keep else None
+            added = update_analysis(hist_path, output_path, df_history, existing, live_path)
+            
+            if added is not None:
+                print(f"Analysis updated for {symbol}: {len(added)} new rows")
+
+                if keep:
+                    existing["Timestamp"] = pd.to_datetime(existing["Timestamp"])
+                    frames[symbol] = pd.concat([existing, added], ignore_index = True)
+                continue
+
+        df_symbol = load_historical(hist_path) if df_history is None else df_history
+        df_symbol = with_live_bars(df_symbol, live_path)
     
         # Add indicators and signals
-        df_symbol = add_ma(df_symbol, 10)
-        df_symbol = add_ma(df_symbol, 50)
-        df_symbol = add_percent_change(df_symbol)
-        df_symbol = add_trend(df_symbol, "MA50")
-        df_symbol = generate_signals(df_symbol)
-        df_symbol = add_position(df_symbol)
+        df_symbol = add_analysis_columns(df_symbol)
 
         # Save to correct analysis folder
 
-        output_path = f"project/data/{analysis_folder}/analysis-{symbol}.csv"
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df_symbol.to_csv(output_path, index=False)
+        write_frame(df_symbol, output_path)
 
         #print(df_symbol[["Timestamp","MA10","MA50", "Signal", "Position"]].iloc[45:70])
         print(f"Analysis saved for {symbol}")
+
+        if keep:
+            frames[symbol] = df_symbol
+
+    return frames
         
-def export_all_trades():
+def export_all_trades(workers = None):
     """
     Exports the full trade log 
     for all symbols to a single CSV.
@@ -160,30 +582,37 @@ def export_all_trades():
     for easy project tracking.
     """
 
-    all_trade = []
-    for symbol in symbols:
-
-        per_stock_balance = wallet_balance / len(symbols)
-
-        df = pd.read_csv(analysis_path.format(symbol = symbol))
-        results, trade_log = backtest_signals(df, balance = per_stock_balance)
-        all_trade.extend(trade_log)
-    df_all_trade = pd.DataFrame(all_trade)
+    outputs = backtest_all_symbols(workers, write_trades = False)
+    df_all_trade = combine_trade_logs(trade_log for _, _, trade_log in outputs)
     df_all_trade.to_csv(trade_log_path, index = False)
 
-def get_all_historical_data():
+def get_all_historical_data(workers = None, batch_size = None):
     """
     Fetches and saves historical price data for all symbols 
     in the project.
     
-    Uses yfinance or similar for bulk data collection.
+    Uses yfinance or similar for bulk data collection,
+    only missing bars when config.incremental_history is set.
+
+    Downloads run on a bounded thread pool with retries 
+    (config.history_workers / history_retries), batch_size > 1 
+    fetches several tickers per request.
+    Prints per-symbol status and timing at the end.
     
     """
     
-    for symbol in symbols:
-         get_historical_data(symbol)
+    statuses = bulk_historical_data(symbols, workers = workers, batch_size = batch_size)
 
-def profit_summary():
+    df_status = pd.DataFrame(statuses)
+    print(df_status.to_string(index = False, 
+                              formatters = {"Seconds": "{:.2f}".format}))
+    
+    failed = (df_status["Status"] != "ok").sum()
+    print(f"{len(df_status) - failed} of {len(df_status)} symbols updated")
+
+    return statuses
+
+def profit_summary(df = None):
 
     """
     Calculates and logs profit/loss statistics 
@@ -191,12 +620,16 @@ def profit_summary():
 
     Outputs total profit, win rate, average win/loss, 
     and max wins/losses to log files.
+
+    Uses the given trade log DataFrame, 
+    or reads trade_log_path when none is passed.
     
     """
 
     header = not os.path.exists(profit_summary_csv)
 
-    df = pd.read_csv(trade_log_path)
+    if df is None:
+        df = pd.read_csv(trade_log_path)
     total_profit = df["Profit"].sum()
     win_rate = (df["Profit"] > 0).mean() * 100
     avg_win = df[df["Profit"] > 0]["Profit"].mean()
@@ -0,0 +1,150 @@
+"""
+Storage layer for historical and analysis data.
+Reads and writes CSV, Parquet or Feather files
+depending on config.storage_format.
+
+Parquet and Feather keep typed timestamps and
+support loading only some columns (need pyarrow).
+
+"""
+
+import glob
+import os
+
+import pandas as pd
+
+from config import storage_format, analysis_path, interval
+from modules.utils import read_csv_tail
+
+FORMAT_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+
+TIMESTAMP_COLUMNS = ("Timestamp", "Datetime")
+
+def analysis_file(symbol):
+    """
+    Path of a symbol's analysis file for the current interval
+    (data/Analysis_Hourly or data/Analysis_Daily), written by
+    prepare_analysis and read by the backtests.
+    """
+    folder = "Analysis_Hourly" if interval == "1h" else "Analysis_Daily"
+    return analysis_path.format(symbol = symbol).replace("project/data/", f"project/data/{folder}/")
+
+def storage_path(path, fmt = None):
+    """
+    Swaps the file extension of a data path
+    to the one of the storage format.
+    """
+    fmt = fmt or storage_format
+    root, _ = os.path.splitext(path)
+
+    return root + FORMAT_EXTENSIONS[fmt]
+
+def read_frame(path, columns = None, fmt = None):
+    """
+    Reads a data file into a DataFrame.
+    columns limits the load to those columns.
+    """
+    fmt = fmt or storage_format
+    path = storage_path(path, fmt)
+
+    if fmt == "csv":
+        return pd.read_csv(path, usecols = columns)
+
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns = columns)
+
+    if fmt == "feather":
+        return pd.read_feather(path, columns = columns)
+
+    raise ValueError(f"Unknown storage format: {fmt}")
+
+def write_frame(df, path, fmt = None):
+    """
+    Writes a DataFrame to a data file atomically,
+    timestamps are stored as datetimes in binary formats.
+    """
+    fmt = fmt or storage_format
+    path = storage_path(path, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+
+    # write next to the target and swap in, so readers never see a partial file
+    tmp_path = path + ".tmp"
+
+    if fmt == "csv":
+        df.to_csv(tmp_path, index = False)
+        os.replace(tmp_path, path)
+        return
+
+    df = df.reset_index(drop = True)
+
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column])
+
+    if fmt == "parquet":
+        df.to_parquet(tmp_path, index = False)
+    elif fmt == "feather":
+        df.to_feather(tmp_path)
+    else:
+        raise ValueError(f"Unknown storage format: {fmt}")
+    
+    os.replace(tmp_path, path)
+
+def frame_exists(path, fmt = None):
+    """
+    Checks if a data file exists in the storage format.
+    """
+    return os.path.exists(storage_path(path, fmt))
+
+def read_frame_tail(path, rows, fmt = None):
+    """
+    Reads the last rows of a data file.
+    CSV files are read backwards from the end.
+    """
+    fmt = fmt or storage_format
+
+    if fmt == "csv":
+        return read_csv_tail(storage_path(path, fmt), rows)
+
+    return read_frame(path, fmt = fmt).tail(rows).reset_index(drop = True)
+
+def append_frame(df, path, fmt = None):
+    """
+    Appends rows to an existing data file.
+    Binary formats are rewritten with the new rows.
+    """
+    fmt = fmt or storage_format
+
+    if fmt == "csv":
+        df.to_csv(storage_path(path, fmt), mode = "a", header = False, index = False)
+        return
+
+    existing = read_frame(path, fmt = fmt)
+
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            df = df.assign(**{column: pd.to_datetime(df[column])})
+
+    write_frame(pd.concat([existing, df[existing.columns]], ignore_index = True), path, fmt)
+
+def convert_data_tree(fmt = None, root = "project/data"):
+    """
+    One-shot converter: writes every CSV under the historical
+    and analysis folders of root in the given storage format.
+    """
+    fmt = fmt or storage_format
+
+    if fmt == "csv":
+        print("Storage format is csv, nothing to convert")
+        return
+
+    paths = sorted(glob.glob(os.path.join(root, "*", "historical_prices-*.csv")) +
+                   glob.glob(os.path.join(root, "*", "analysis-*.csv")))
+
+    for path in paths:
+        write_frame(pd.read_csv(path), path, fmt)
+        print(f"Converted {path} -> {storage_path(path, fmt)}")
@@ -3,8 +3,11 @@ Trading strategy logic for generating signals
 and positions based on moving averages.
 """
 
+import math
 import numpy as np
+import pandas as pd
 from config import Fast_MA, Slow_MA
+from modules.indicators import rolling_means
 
 def generate_signals(df):
     """
@@ -18,10 +21,99 @@ def generate_signals(df):
     
     return df
 
-def add_position(df):
+def carry_forward(signal):
+    """
+    carry_forward - position rule, takes the last non-zero 
+    signal and carries it forward, 0 before the first signal
+    """
+    
+    return signal.replace(0, np.nan).ffill().fillna(0).astype(np.int64)
+
+def flat_on_zero(signal):
+    """
+    flat_on_zero - position rule, follows the signal 
+    and goes flat whenever the signal is 0
+    """
+
+    return signal.astype(np.int64)
+
+def hold_n_bars(signal, bars):
+    """
+    hold_n_bars - position rule, holds each new position 
+    (a change of the carried signal) for bars bars, 
+    then goes flat until the signal changes again
+    """
+
+    position = carry_forward(signal)
+    is_entry = (position != 0) & (position != position.shift(1, fill_value = 0))
+    
+    index = pd.Series(np.arange(len(signal)), index = signal.index)
+    last_entry_index = index.where(is_entry).ffill()
+    bars_since = index - last_entry_index
+    
+    position = position.where(bars_since < bars, 0)
+    
+    return position.astype(np.int64)
+
+def cooldown_after_exit(signal, bars):
+    """
+    cooldown_after_exit - position rule, carries the signal 
+    forward but stays flat for bars bars after each exit
+    """
+
+    position = carry_forward(signal)
+    prev_position = position.shift(1, fill_value = 0)
+
+    index = pd.Series(np.arange(len(signal)), index = signal.index)
+    is_exit = (prev_position != 0) & (position != prev_position)
+    last_exit_index = index.where(is_exit).ffill()
+    bars_since = index - last_exit_index
+    
+    position = position.where(~(bars_since < bars), 0)
+    
+    return position.astype(np.int64)
+
+def add_position(df, rule = carry_forward, **kwargs):
     """
     add_position - adds the position depending on the signal,
     carries position forward if no new signal
+
+    rule is a vectorized transform Signal -> Position 
+    (carry_forward, flat_on_zero, hold_n_bars, cooldown_after_exit),
+    extra keyword arguments are passed to it
+    """
+
+    df["Position"] = rule(df["Signal"], **kwargs)
+    
+    return df
+
+def crossover_positions(fast_ma, slow_ma):
+    """
+    crossover_positions - same rules as generate_signals + 
+    add_position, on NumPy arrays
+    """
+    signal = np.zeros(len(fast_ma), dtype = np.int64)
+    signal[fast_ma > slow_ma] = 1
+    signal[fast_ma < slow_ma] = -1
+
+    return carry_forward(pd.Series(signal)).to_numpy()
+
+def strategy_positions(prices):
+    """
+    strategy_positions - positions for the configured 
+    Fast_MA / Slow_MA crossover straight from a price array
+    """
+    fast_window = int(Fast_MA.replace("MA", ""))
+    slow_window = int(Slow_MA.replace("MA", ""))
+    fast_ma, slow_ma = rolling_means(prices, [fast_window, slow_window])
+
+    return crossover_positions(fast_ma, slow_ma)
+
+def add_position_loop(df):
+    """
+    add_position_loop - original row by row version of 
+    add_position with the carry_forward rule, 
+    kept as the benchmark reference
     """
 
     prev_position = 0
@@ -45,3 +137,122 @@ def add_position(df):
     
     return df
 
+class RollingMean:
+    """
+    RollingMean - O(1) per value rolling mean over a ring buffer,
+    same compensated add/remove steps as pandas rolling().mean()
+    so streamed values match add_ma
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.buffer = [math.nan] * window
+        self.count = 0
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_values = 0
+        self.prev_value = math.nan
+
+    def update(self, value):
+        slot = self.count % self.window
+
+        # drop the value leaving the window
+        if self.count >= self.window:
+            old = self.buffer[slot]
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.compensation_remove
+                t = self.sum_x + y
+                self.compensation_remove = t - self.sum_x - y
+                self.sum_x = t
+                if math.copysign(1, old) < 0:
+                    self.neg_ct -= 1
+
+        if value == value:
+            self.nobs += 1
+            y = value - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1, value) < 0:
+                self.neg_ct += 1
+
+            self.same_values = self.same_values + 1 if value == self.prev_value else 1
+            self.prev_value = value
+
+        self.buffer[slot] = value
+        self.count += 1
+
+        if self.nobs < self.window:
+            return math.nan
+
+        result = self.sum_x / self.nobs
+        if self.same_values >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+
+        return result
+
+class StreamingStrategy:
+    """
+    StreamingStrategy - bar by bar version of the analysis 
+    columns (Fast_MA / Slow_MA, Percentage_Change, slow MA trend,
+    Signal and carried Position), O(1) work per price
+    """
+
+    def __init__(self, fast_window = None, slow_window = None, position = 0):
+        self.fast_window = fast_window or int(Fast_MA.replace("MA", ""))
+        self.slow_window = slow_window or int(Slow_MA.replace("MA", ""))
+        self.fast_ma = RollingMean(self.fast_window)
+        self.slow_ma = RollingMean(self.slow_window)
+        self.prev_price = math.nan
+        self.prev_slow = math.nan
+        self.position = position
+
+    def update(self, price):
+        """
+        Takes the next price, returns the new row values.
+        """
+        fast = self.fast_ma.update(price)
+        slow = self.slow_ma.update(price)
+
+        percentage_change = (price / self.prev_price - 1) * 100
+        trend = float(np.sign(slow - self.prev_slow))
+
+        if fast > slow:
+            signal = 1
+        elif fast < slow:
+            signal = -1
+        else:
+            signal = 0
+
+        if signal != 0:
+            self.position = signal
+
+        self.prev_price = price
+        self.prev_slow = slow
+
+        return {
+            f"MA{self.fast_window}": fast,
+            f"MA{self.slow_window}": slow,
+            "Percentage_Change": percentage_change,
+            f"MA{self.slow_window}_trend": trend,
+            "Signal": signal,
+            "Position": self.position,
+        }
+
+    def warm_up(self, prices):
+        """
+        Feeds past prices to fill the MA windows,
+        returns the last row values (None without prices).
+        """
+        state = None
+        for price in prices:
+            state = self.update(price)
+        return state
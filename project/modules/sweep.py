@@ -0,0 +1,131 @@
+"""
+Parameter sweep / grid search over Fast_MA, Slow_MA,
+stop_loss, take_profit and risk_per_trade.
+
+Each moving average is computed once per symbol and
+reused by every combination that needs it.
+Symbols are spread over a process pool.
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import pandas as pd
+
+from config import (symbols, wallet_balance, sweep_fast_windows, sweep_slow_windows,
+    sweep_stop_losses, sweep_take_profits, sweep_risks, sweep_workers, sweep_results_path)
+from modules.backtest import backtest_arrays
+from modules.indicators import rolling_means
+from modules.price_fetcher import historical_path
+from modules.storage import read_frame
+from modules.strategy import crossover_positions
+
+def parameter_grid(fast_windows = None, slow_windows = None, stop_losses = None,
+                   take_profits = None, risks = None):
+    """
+    Builds the list of parameter combinations
+    (config sweep_* values by default).
+    Only combinations with fast window < slow window are kept.
+    """
+    grid = product(
+        fast_windows or sweep_fast_windows,
+        slow_windows or sweep_slow_windows,
+        stop_losses or sweep_stop_losses,
+        take_profits or sweep_take_profits,
+        risks or sweep_risks)
+
+    return [{"Fast": fast, "Slow": slow, "Stop Loss": sl,
+             "Take Profit": tp, "Risk": risk}
+            for fast, slow, sl, tp, risk in grid if fast < slow]
+
+def moving_averages(prices, windows):
+    """
+    Computes every rolling mean window in one batched pass.
+    Returns {window: array view}.
+    """
+    windows = sorted(windows)
+    means = rolling_means(prices, windows)
+
+    return dict(zip(windows, means))
+
+def sweep_symbol(symbol, grid, balance):
+    """
+    Runs every parameter combination on one symbol.
+    Returns a list of result rows, raises ValueError when a
+    trade's profit exceeds its position notional.
+    """
+    df = read_frame(historical_path(symbol))
+    time_column = "Datetime" if "Datetime" in df.columns else "Timestamp"
+
+    prices = df["Price"].to_numpy(dtype = float)
+    times = df[time_column].tolist()
+
+    windows = {params["Fast"] for params in grid} | {params["Slow"] for params in grid}
+    averages = moving_averages(prices, windows)
+    positions = {}
+
+    rows = []
+    for params in grid:
+        pair = (params["Fast"], params["Slow"])
+
+        if pair not in positions:
+            positions[pair] = crossover_positions(averages[pair[0]], averages[pair[1]])
+
+        results, store = backtest_arrays(
+            prices, positions[pair], times, symbol, balance,
+            stop_loss = params["Stop Loss"], take_profit = params["Take Profit"],
+            risk_per_trade = params["Risk"], log_format = "store")
+
+        # a trade earning more than its notional means broken sizing, not a good combination
+        oversized = store.oversized()
+        if oversized:
+            raise ValueError(f"{symbol} {params}: {oversized} trades with profit above "
+                             f"their position notional")
+
+        rows.append({
+            "Symbol": symbol,
+            "Fast_MA": f"MA{params['Fast']}",
+            "Slow_MA": f"MA{params['Slow']}",
+            "Stop Loss": params["Stop Loss"],
+            "Take Profit": params["Take Profit"],
+            "Risk": params["Risk"],
+            "Total Trades": results["Total Trades"],
+            "Win Rate": results["Win Rate"],
+            "Expectancy": results["expectancy"],
+            "Total Profit": results["Total Profit"],
+        })
+
+    return rows
+
+def run_sweep(grid = None, workers = None, sweep_symbols = None, save = True):
+    """
+    Sweeps the parameter grid over all symbols.
+
+    Returns a results table ranked by Total Profit within
+    each symbol (Rank 1 = best), saved to sweep_results_path.
+    """
+    grid = grid or parameter_grid()
+    workers = workers or sweep_workers
+    sweep_symbols = sweep_symbols or symbols
+
+    per_stock_balance = wallet_balance / len(sweep_symbols)
+    grids = [grid] * len(sweep_symbols)
+    balances = [per_stock_balance] * len(sweep_symbols)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            outputs = list(executor.map(sweep_symbol, sweep_symbols, grids, balances))
+    else:
+        outputs = list(map(sweep_symbol, sweep_symbols, grids, balances))
+
+    df = pd.DataFrame([row for rows in outputs for row in rows])
+    df = df.sort_values(["Symbol", "Total Profit", "Expectancy"],
+                        ascending = [True, False, False], kind = "stable")
+    df.insert(1, "Rank", df.groupby("Symbol").cumcount() + 1)
+    df = df.reset_index(drop = True)
+
+    if save:
+        df.to_csv(sweep_results_path, index = False)
+
+    return df
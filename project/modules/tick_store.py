@@ -0,0 +1,139 @@
+"""
+Append-only binary tick store written next to prices.txt.
+
+Each tick is one fixed-size TICK_DTYPE record (int64 ns
+timestamp, int32 symbol id, float64 price) appended to
+tick_store_path, symbol ids are line numbers in the
+"{tick_store_path}.symbols" text file. Records go through
+the background log writer when async_logging is on.
+
+Reading is a single np.fromfile / memmap, no parsing.
+Ids are assigned by the writing process, so one live
+process should write a store at a time.
+
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import tick_store_path, async_logging
+from modules.log_writer import get_log_writer
+
+TICK_DTYPE = np.dtype([("Timestamp", "<i8"), ("Symbol", "<i4"), ("Price", "<f8")])
+
+def symbols_path(path):
+    return path + ".symbols"
+
+def read_tick_symbols(path = None):
+    """
+    Symbol table of a tick store (index = symbol id).
+    """
+    path = symbols_path(path or tick_store_path)
+
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r") as file:
+        return [line.rstrip("\n") for line in file]
+
+class TickStore:
+    """
+    Appends ticks to one store file.
+    """
+
+    def __init__(self, path = None):
+        self.path = path or tick_store_path
+        self.symbols = read_tick_symbols(self.path)
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def symbol_id(self, symbol):
+        if symbol not in self.symbol_ids:
+            # new symbols are rare, written straight away so readers can resolve them
+            with open(symbols_path(self.path), "a") as file:
+                file.write(symbol + "\n")
+            self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        return self.symbol_ids[symbol]
+
+    def append(self, symbol, price, timestamp):
+        """
+        Appends one tick, timestamp is a datetime.
+        """
+        record = np.array([(pd.Timestamp(timestamp).value, self.symbol_id(symbol), float(price))],
+                          dtype = TICK_DTYPE).tobytes()
+
+        if async_logging:
+            get_log_writer().write(self.path, record)
+        else:
+            with open(self.path, "ab") as file:
+                file.write(record)
+
+    def append_many(self, timestamps, symbols, prices):
+        """
+        Appends a batch of ticks: int64 ns timestamps,
+        symbol names and prices (equal length arrays).
+        """
+        codes, uniques = pd.factorize(np.asarray(symbols, dtype = object))
+        ids = np.array([self.symbol_id(symbol) for symbol in uniques], dtype = np.int32)
+
+        records = np.empty(len(prices), dtype = TICK_DTYPE)
+        records["Timestamp"] = timestamps
+        records["Symbol"] = ids[codes]
+        records["Price"] = prices
+
+        with open(self.path, "ab") as file:
+            records.tofile(file)
+
+_tick_store = None
+
+def get_tick_store():
+    """
+    Returns the tick store of this process.
+    """
+    global _tick_store
+
+    if _tick_store is None:
+        _tick_store = TickStore()
+
+    return _tick_store
+
+def read_ticks(path = None, mmap = False):
+    """
+    Loads a tick store into a DataFrame with Timestamp (datetime),
+    Symbol (categorical) and Price columns. mmap maps the file
+    instead of reading it.
+    """
+    path = path or tick_store_path
+    symbols = read_tick_symbols(path)
+
+    if mmap:
+        records = np.memmap(path, dtype = TICK_DTYPE, mode = "r")
+    else:
+        records = np.fromfile(path, dtype = TICK_DTYPE)
+
+    return pd.DataFrame({
+        "Timestamp": records["Timestamp"].astype("datetime64[ns]"),
+        "Symbol": pd.Categorical.from_codes(records["Symbol"], categories = symbols),
+        "Price": records["Price"],
+    })
+
+def import_price_log(text_path, path = None, chunk_bytes = None):
+    """
+    Appends every tick of a prices.txt style log to a
+    tick store (catch-up for logs written before the store).
+    """
+    from modules.utils import iter_prices
+
+    store = TickStore(path)
+    ticks = 0
+
+    for chunk in iter_prices(text_path, chunk_bytes):
+        timestamps = pd.to_datetime(chunk["Timestamp"]).to_numpy(dtype = "datetime64[ns]")
+        store.append_many(timestamps.view(np.int64), chunk["Symbol"].to_numpy(),
+                          chunk["Price"].to_numpy())
+        ticks += len(chunk)
+
+    return ticks
@@ -0,0 +1,173 @@
+"""
+Compact trade store for the backtest engines.
+
+Trades live in one preallocated NumPy structured array
+(TRADE_DTYPE) that doubles in size when full, instead of
+one dict per trade. Wins and losses are kept as running
+counts and sums, so no per-trade profit lists are needed.
+
+to_frame returns DataFrame columns that are views on the
+array (no copy), to_trade_log the trade_log columns as a
+DataFrame (what the trade CSVs are written from) and
+to_records the list-of-dicts trade_log of the loop engine,
+kept for parity checks.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADE_DTYPE = np.dtype([
+    ("Symbol", np.int32),
+    ("Entry Index", np.int64),
+    ("Exit Index", np.int64),
+    ("Entry Price", np.float64),
+    ("Exit Price", np.float64),
+    ("Side", np.int8),
+    ("Quantity", np.float64),
+    ("Profit", np.float64),
+    ("Balance", np.float64),
+])
+
+# trade_log keys / columns, as written by the close helpers
+TRADE_LOG_COLUMNS = ["Symbol", "Entry Price", "Entry Time", "Exit Time", "Exit Price",
+                     "Closed Position", "Profit", "Balance"]
+
+class TradeStore:
+    """
+    Growable structured array of trades, symbols are stored
+    as ids into self.symbols.
+    """
+
+    def __init__(self, capacity = 1024):
+        self.data = np.empty(max(1, capacity), dtype = TRADE_DTYPE)
+        self.size = 0
+        self.symbols = []
+        self.symbol_ids = {}
+
+        self.wins = 0
+        self.losses = 0
+        self.win_sum = 0.0
+        self.loss_sum = 0.0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def trades(self):
+        return self.data[:self.size]
+
+    def symbol_id(self, symbol):
+        if symbol not in self.symbol_ids:
+            self.symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        return self.symbol_ids[symbol]
+
+    def add(self, symbol_id, entry, exit, entry_price, exit_price, side, quantity,
+            profit, balance):
+        """
+        Appends one closed trade and updates the win/loss sums.
+        """
+        if self.size == len(self.data):
+            data = np.empty(len(self.data) * 2, dtype = TRADE_DTYPE)
+            data[:self.size] = self.data
+            self.data = data
+
+        self.data[self.size] = (symbol_id, entry, exit, entry_price, exit_price, side,
+                                quantity, profit, balance)
+        self.size += 1
+
+        if profit > 0:
+            self.wins += 1
+            self.win_sum += profit
+
+        if profit < 0:
+            self.losses += 1
+            self.loss_sum += profit
+
+    def summary(self, balance):
+        """
+        Results dict in the backtest_signals format,
+        balance is the final balance.
+        """
+        total_trade = self.wins + self.losses
+
+        wr = self.wins / total_trade if total_trade > 0 else 0
+        average_win = self.win_sum / self.wins if self.wins > 0 else 0
+        average_loss = abs(self.loss_sum) / self.losses if self.losses > 0 else 0
+
+        expectancy = wr * average_win - (1 - wr) * average_loss
+        sides = self.trades["Side"]
+
+        return {
+            "Total Trades": total_trade,
+            "Win Rate": wr*100,
+            "Wins": self.wins,
+            "Average Win": average_win,
+            "Losses": self.losses,
+            "Average Loss": average_loss,
+            "expectancy": round(expectancy, 2),
+            "Total Profit": round(balance, 2),
+            "Long Trades": int(np.count_nonzero(sides == 1)),
+            "Short Trades": int(np.count_nonzero(sides == -1))
+        }
+
+    def oversized(self):
+        """
+        Number of trades whose profit exceeds their position
+        notional (|quantity x entry price|), which a correctly
+        sized trade cannot reach within one SL/TP exit.
+        """
+        trades = self.trades
+        return int(np.count_nonzero(trades["Profit"] > np.abs(trades["Quantity"] * trades["Entry Price"])))
+
+    def to_frame(self):
+        """
+        DataFrame of the trades, columns are views on the store.
+        """
+        trades = self.trades
+        return pd.DataFrame({name: trades[name] for name in TRADE_DTYPE.names}, copy = False)
+
+    def to_trade_log(self, times):
+        """
+        Trade log as a DataFrame with the trade_log columns (same
+        values as to_records, no dict per trade), times maps bar
+        indexes to timestamps.
+        """
+        trades = self.trades
+        symbols = np.array(self.symbols, dtype = object)
+
+        return pd.DataFrame({
+            "Symbol": symbols[trades["Symbol"]],
+            "Entry Price": trades["Entry Price"],
+            "Entry Time": [times[entry] for entry in trades["Entry Index"].tolist()],
+            "Exit Time": [times[exit] for exit in trades["Exit Index"].tolist()],
+            "Exit Price": trades["Exit Price"],
+            "Closed Position": trades["Side"].astype(np.int64),
+            # Python round, as the close helpers
+            "Profit": [round(profit, 2) for profit in trades["Profit"].tolist()],
+            "Balance": [round(balance, 2) for balance in trades["Balance"].tolist()],
+        })
+
+    def to_records(self, times):
+        """
+        Trade log as a list of dicts (same keys as the close
+        helpers), times maps bar indexes to timestamps.
+        """
+        trades = self.trades
+
+        return [{
+            "Symbol": self.symbols[symbol_id],
+            "Entry Price": entry_price,
+            "Entry Time": times[entry],
+            "Exit Time": times[exit],
+            "Exit Price": exit_price,
+            "Closed Position": side,
+            "Profit": round(profit, 2),
+            "Balance": round(balance, 2)
+        } for symbol_id, entry, exit, entry_price, exit_price, side, profit, balance in zip(
+            trades["Symbol"].tolist(), trades["Entry Index"].tolist(),
+            trades["Exit Index"].tolist(), trades["Entry Price"].tolist(),
+            trades["Exit Price"].tolist(), trades["Side"].tolist(),
+            trades["Profit"].tolist(), trades["Balance"].tolist())]
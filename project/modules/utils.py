@@ -4,8 +4,43 @@ and loading price logs into a DataFrame.
 """
 
 import pandas as pd
+import io
+import os
 from datetime import datetime
-from config import error_log_path, prices_log_path
+import re
+from config import (error_log_path, prices_log_path, async_logging, tick_store, 
+     price_log_chunk_bytes, price_log_engine)
+from modules.log_writer import get_log_writer
+from modules.tick_store import get_tick_store
+
+# "[timestamp] SYMBOL price: 123.45 " lines written by save_price
+PRICE_LINE = re.compile(r"^\[([^\]\n]*)\]\s*(.*?)\s*price:[ \t]*(\S+)[ \t]*$")
+
+# the same lines split on spaces: "[date", "time]", symbol, "price:", price, ""
+PRICE_LOG_FIELDS = ["Date", "Time", "Symbol", "Key", "Price", "End"]
+PRICE_LOG_DTYPES = {"Date": str, "Time": str, "Symbol": str, 
+                    "Key": str, "Price": "float64"}
+
+def write_log(path, line):
+     """
+     Appends one line to a log file, through the 
+     background log writer when async_logging is on.
+     """
+
+     if async_logging:
+          get_log_writer().write(path, line)
+          return
+
+     with open(path, "a") as file:
+          file.write(line)
+
+def flush_logs():
+     """
+     Waits until all queued log lines are on disk.
+     """
+
+     if async_logging:
+          get_log_writer().flush()
 
 def log_error(symbol,error):
      """
@@ -13,28 +48,125 @@ def log_error(symbol,error):
      to the error log file.
      """
 
-     with open(error_log_path, "a") as file:
-            file.write(f"[{datetime.now()}] API call failed for {symbol}: {error}\n")
+     write_log(error_log_path, f"[{datetime.now()}] API call failed for {symbol}: {error}\n")
 
 def save_price(symbol, price):
       """
       Appends the current price
-      of a symbol to the prices log file.
+      of a symbol to the prices log file,
+      and to the binary tick store when enabled.
       """
      
-      with open(prices_log_path, "a") as file:
-        file.write(f"[{datetime.now()}] {symbol} price: {price} \n")
+      now = datetime.now()
+      write_log(prices_log_path, f"[{now}] {symbol} price: {price} \n")
+
+      if tick_store:
+           get_tick_store().append(symbol, price, now)
+
+def iter_prices(filepath, chunk_bytes = None):
+      """
+      Streams a price log file as DataFrames of Timestamp,
+      Symbol and Price, reading about chunk_bytes at a time.
+
+      """
+      chunk_bytes = chunk_bytes or price_log_chunk_bytes
+
+      flush_logs()
+
+      with open(filepath, "rb") as file:
+           rest = b""
+
+           while True:
+                block = file.read(chunk_bytes)
+                data = rest + block
+
+                if block:
+                     # keep the partial last line for the next chunk
+                     cut = data.rfind(b"\n") + 1
+                     data, rest = data[:cut], data[cut:]
+
+                if data:
+                     yield parse_price_lines(data)
+
+                if not block:
+                     break
 
-def load_prices(filepath):
+def parse_price_lines(data):
+      """
+      Parses complete price log lines (bytes) into a DataFrame.
+
+      Lines are split on spaces by read_csv (price_log_engine),
+      chunks with any line off the save_price format go through
+      the regex parser instead.
+
+      """
+      try:
+           df = pd.read_csv(io.BytesIO(data), sep = " ", header = None, 
+                            names = PRICE_LOG_FIELDS, dtype = PRICE_LOG_DTYPES, 
+                            engine = price_log_engine)
+      except (ValueError, pd.errors.ParserError):
+           return parse_price_lines_regex(data.decode())
+
+      valid = ((df["Key"] == "price:") & df["Date"].str.startswith("[") & 
+               df["Time"].str.endswith("]") & df["Price"].notna() & df["End"].isna())
+      
+      if not valid.all():
+           return parse_price_lines_regex(data.decode())
+
+      return pd.DataFrame({
+           "Timestamp": df["Date"].str.slice(1) + " " + df["Time"].str.slice(0, -1),
+           "Symbol": df["Symbol"],
+           "Price": df["Price"]
+           })
+
+def parse_price_lines_regex(text):
+      """
+      Regex version of parse_price_lines, logs and 
+      skips malformed lines.
+
+      """
+      lines = pd.Series(text.splitlines())
+      lines = lines[lines.str.strip() != ""]
+
+      parsed = lines.str.extract(PRICE_LINE)
+      prices = pd.to_numeric(parsed[2], errors = "coerce")
+      
+      for line in lines[prices.isna()]:
+           log_error("load_Prices", f"Malformed line: {line.strip()}")
+
+      valid = prices.notna()
+      
+      return pd.DataFrame({
+           "Timestamp": parsed.loc[valid, 0],
+           "Symbol": parsed.loc[valid, 1],
+           "Price": prices[valid]
+           }).reset_index(drop = True)
+
+def load_prices(filepath, chunk_bytes = None):
       """
       Parses a price log file into a DataFrame with Timestamp
       Symbol and Price columns.
 
+      """
+      chunks = list(iter_prices(filepath, chunk_bytes))
+      
+      if not chunks:
+           return pd.DataFrame({"Timestamp": [], "Symbol": [], "Price": []})
+      
+      return pd.concat(chunks, ignore_index = True)
+
+def load_prices_loop(filepath):
+      """
+      Line by line version of load_prices, 
+      kept as the reference for benchmarks.
+
       """       
       prices = []
       symbols = []
       time_stamps = []
 
+      flush_logs()
+
       with open(filepath, "r") as file:
           for line in file:
                try: 
@@ -62,8 +194,34 @@ def load_prices(filepath):
       df = pd.DataFrame(DF)
       return(df)
 
-     
+def read_csv_tail(filepath, rows):
+      """
+      Reads the header and the last rows lines of a CSV
+      into a DataFrame without parsing the rest of the file.
+      
+      """
+      block_size = 64 * 1024
+
+      with open(filepath, "rb") as file:
+           header = file.readline()
+           data_start = file.tell()
 
+           file.seek(0, os.SEEK_END)
+           position = file.tell()
+           tail = b""
 
+           # read backwards until there are enough complete lines
+           while position > data_start and tail.count(b"\n") <= rows:
+                read_size = min(block_size, position - data_start)
+                position -= read_size
+                file.seek(position)
+                tail = file.read(read_size) + tail
 
+      lines = tail.splitlines()
+      if position > data_start:
+           lines = lines[1:]  # first line may be partial
+      
+      lines = [line for line in lines[-rows:] if line.strip()] if rows > 0 else []
+      text = b"\n".join([header.rstrip(b"\r\n")] + lines).decode()
 
+      return pd.read_csv(io.StringIO(text))
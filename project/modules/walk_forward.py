@@ -0,0 +1,165 @@
+"""
+Walk-forward optimisation with out-of-sample scoring.
+
+Each symbol's series is cut into rolling windows of
+train bars followed by test bars. The best parameters
+of the sweep grid on the train bars are scored on the
+test bars that come right after them.
+
+Moving averages and positions are computed once per
+symbol over the whole series (a trailing mean does not
+look ahead) and sliced for every window. Windows are
+spread over a process pool.
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from config import (symbols, wallet_balance, walk_forward_train_bars, walk_forward_test_bars,
+    walk_forward_workers, walk_forward_report_path, walk_forward_equity_path)
+from modules.backtest import backtest_arrays
+from modules.price_fetcher import historical_path
+from modules.storage import read_frame
+from modules.strategy import crossover_positions
+from modules.sweep import parameter_grid, moving_averages
+
+def walk_forward_windows(rows, train_bars = None, test_bars = None):
+    """
+    Returns (train_start, test_start, test_stop) of every
+    window, windows move forward by test_bars.
+    """
+    train_bars = train_bars or walk_forward_train_bars
+    test_bars = test_bars or walk_forward_test_bars
+
+    return [(start, start + train_bars, start + train_bars + test_bars)
+            for start in range(0, rows - train_bars - test_bars + 1, test_bars)]
+
+_symbol_arrays = {}
+
+def symbol_arrays(symbol, grid):
+    """
+    Loads one symbol's prices, times and the positions of every
+    MA pair of the grid. Kept per process, so all windows of a
+    symbol handled by a worker share one copy.
+    """
+    pairs = tuple(sorted({(params["Fast"], params["Slow"]) for params in grid}))
+    key = (symbol, pairs)
+
+    if key not in _symbol_arrays:
+        df = read_frame(historical_path(symbol))
+        time_column = "Datetime" if "Datetime" in df.columns else "Timestamp"
+        prices = df["Price"].to_numpy(dtype = float)
+
+        averages = moving_averages(prices, {window for pair in pairs for window in pair})
+        positions = {pair: crossover_positions(averages[pair[0]], averages[pair[1]])
+                     for pair in pairs}
+
+        _symbol_arrays[key] = (prices, df[time_column].tolist(), positions)
+
+    return _symbol_arrays[key]
+
+def run_window(symbol, grid, window, balance):
+    """
+    Runs every grid combination on one train window,
+    then the best one on the test window after it.
+    Returns a report row.
+    """
+    prices, times, positions = symbol_arrays(symbol, grid)
+    train_start, test_start, test_stop = window
+
+    def backtest(params, start, stop):
+        results, _ = backtest_arrays(
+            prices[start:stop], positions[(params["Fast"], params["Slow"])][start:stop],
+            times[start:stop], symbol, balance,
+            stop_loss = params["Stop Loss"], take_profit = params["Take Profit"],
+            risk_per_trade = params["Risk"], log_format = "store")
+        return results
+
+    # rank like run_sweep: Total Profit, then expectancy
+    scored = [(backtest(params, train_start, test_start), params) for params in grid]
+    train_results, best = max(scored, key = lambda item: (item[0]["Total Profit"],
+                                                         item[0]["expectancy"]))
+    test_results = backtest(best, test_start, test_stop)
+
+    return {
+        "Symbol": symbol,
+        "Train Start": times[train_start],
+        "Test Start": times[test_start],
+        "Test End": times[test_stop - 1],
+        "Fast_MA": f"MA{best['Fast']}",
+        "Slow_MA": f"MA{best['Slow']}",
+        "Stop Loss": best["Stop Loss"],
+        "Take Profit": best["Take Profit"],
+        "Risk": best["Risk"],
+        "Train Trades": train_results["Total Trades"],
+        "Train Profit": train_results["Total Profit"],
+        "Test Trades": test_results["Total Trades"],
+        "Test Win Rate": test_results["Win Rate"],
+        "Test Expectancy": test_results["expectancy"],
+        "Test Profit": test_results["Total Profit"],
+        "Test Return": test_results["Total Profit"] / balance - 1,
+    }
+
+def out_of_sample_equity(report, balance):
+    """
+    Chains the test window returns of each symbol into an
+    equity curve starting at balance. The Portfolio rows sum
+    the symbol curves window by window (a symbol with fewer
+    windows keeps its last equity). An empty report (no symbol
+    long enough for one window) gives an empty frame.
+    """
+    if report.empty:
+        return pd.DataFrame(columns = ["Symbol", "Window", "Test End", "Equity"])
+
+    report = report.assign(Window = report.groupby("Symbol").cumcount() + 1)
+    report["Equity"] = balance * (1 + report["Test Return"]).groupby(report["Symbol"]).cumprod()
+
+    curves = report[["Symbol", "Window", "Test End", "Equity"]]
+
+    portfolio = curves.pivot(index = "Window", columns = "Symbol", values = "Equity")
+    portfolio = portfolio.ffill().fillna(balance).sum(axis = 1)
+    portfolio = pd.DataFrame({"Symbol": "Portfolio", "Window": portfolio.index,
+                              "Test End": None, "Equity": portfolio.to_numpy()})
+
+    return pd.concat([curves, portfolio], ignore_index = True)
+
+def run_walk_forward(grid = None, workers = None, wf_symbols = None,
+                     train_bars = None, test_bars = None, save = True):
+    """
+    Walk-forward run over all symbols.
+
+    Returns (report, equity): one report row per window with
+    the chosen parameters and their train / test results, and
+    the out-of-sample equity curves. Both are saved to
+    walk_forward_report_path / walk_forward_equity_path.
+    """
+    grid = grid or parameter_grid()
+    workers = workers or walk_forward_workers
+    wf_symbols = wf_symbols or symbols
+
+    per_stock_balance = wallet_balance / len(wf_symbols)
+
+    tasks = []
+    for symbol in wf_symbols:
+        rows = len(read_frame(historical_path(symbol), columns = ["Price"]))
+        for window in walk_forward_windows(rows, train_bars, test_bars):
+            tasks.append((symbol, grid, window, per_stock_balance))
+
+    # tasks stay grouped by symbol, so chunks keep workers on the same symbol
+    if workers > 1 and tasks:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            rows = list(executor.map(run_window, *zip(*tasks), chunksize = chunksize))
+    else:
+        rows = [run_window(*task) for task in tasks]
+
+    report = pd.DataFrame(rows)
+    equity = out_of_sample_equity(report, per_stock_balance)
+
+    if save:
+        report.to_csv(walk_forward_report_path, index = False)
+        equity.to_csv(walk_forward_equity_path, index = False)
+
+    return report, equity
@@ -0,0 +1,16 @@
+"""
+Puts project/ on sys.path (as python project/Main.py does)
+and runs each test from the repository root, where the
+config paths ("project/...") are relative to.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "project"))
+
+@pytest.fixture(autouse = True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
@@ -0,0 +1,77 @@
+"""
+Offline checks of the incremental history download
+(merge_history) with a fake downloader.
+"""
+import pandas as pd
+import pytest
+
+from modules import price_fetcher
+from modules.storage import read_frame, write_frame
+
+def daily_history(days = 60, scale = 1.0):
+    times = pd.date_range("2024-01-01", periods = days, freq = "D")
+    close = (100 + pd.Series(range(days), dtype = float)) * scale
+
+    return pd.DataFrame({"Timestamp": times.strftime("%Y-%m-%d"), "Close": close,
+                         "High": close + 1, "Low": close - 1, "Open": close,
+                         "Volume": 1000, "Symbol": "TEST", "Price": close})
+
+class FakeDownloader:
+    """
+    Serves start (inclusive) .. end (exclusive) of a history,
+    the whole history without start, and records the requests.
+    """
+    def __init__(self, history):
+        self.history = history
+        self.requests = []
+
+    def __call__(self, symbol, start = None, end = None):
+        self.requests.append((start, end))
+        df = self.history
+        if start is not None:
+            df = df[df["Timestamp"] >= start]
+        if end is not None:
+            df = df[df["Timestamp"] < end]
+        return df.copy() if not df.empty else None
+
+@pytest.fixture
+def history_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "historical_prices-TEST.csv")
+    monkeypatch.setattr(price_fetcher, "historical_path", lambda symbol: path)
+    return path
+
+def stored(path):
+    return read_frame(path).reset_index(drop = True)
+
+def test_tail_and_gap_backfill(history_file):
+    full = daily_history()
+    # stored copy misses 10 days in the middle and the last 15 days
+    write_frame(pd.concat([full.iloc[:20], full.iloc[30:45]]), history_file)
+
+    downloader = FakeDownloader(full)
+    added = price_fetcher.merge_history("TEST", downloader)
+
+    assert added == 25
+    assert len(downloader.requests) == 2
+    pd.testing.assert_frame_equal(stored(history_file), full, check_dtype = False)
+
+def test_up_to_date_history_is_unchanged(history_file):
+    full = daily_history()
+    write_frame(full, history_file)
+
+    downloader = FakeDownloader(full)
+
+    assert price_fetcher.merge_history("TEST", downloader) == 0
+    assert all(start is not None for start, _ in downloader.requests)
+    pd.testing.assert_frame_equal(stored(history_file), full, check_dtype = False)
+
+def test_adjustment_change_downloads_full_window(history_file):
+    write_frame(daily_history().iloc[:45], history_file)
+
+    # a 2:1 split: the provider now returns every bar halved
+    adjusted = daily_history(scale = 0.5)
+    downloader = FakeDownloader(adjusted)
+    price_fetcher.merge_history("TEST", downloader)
+
+    assert downloader.requests[-1] == (None, None)
+    pd.testing.assert_frame_equal(stored(history_file), adjusted, check_dtype = False)
@@ -0,0 +1,43 @@
+"""
+Engines that must give the same output as their reference:
+loop vs vectorized backtest (on the analysis files) and
+streaming vs batch strategy (on the historical files).
+"""
+import glob
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import symbols, wallet_balance
+from modules.backtest import backtest_signals
+from modules.runner import load_historical, add_analysis_columns
+from modules.strategy import StreamingStrategy
+from modules.trade_store import TRADE_LOG_COLUMNS
+
+ANALYSIS_FILES = sorted(glob.glob("project/data/Analysis_Hourly/analysis-*.csv"))
+HISTORY_FILES = sorted(glob.glob("project/data/*/historical_prices-*.csv"))
+
+@pytest.mark.parametrize("path", ANALYSIS_FILES)
+def test_vectorized_backtest_matches_loop(path):
+    df = pd.read_csv(path)
+    balance = wallet_balance / len(symbols)
+
+    loop_results, loop_log = backtest_signals(df, balance, engine = "loop")
+    vec_results, vec_log = backtest_signals(df, balance, engine = "vectorized")
+    _, vec_frame = backtest_signals(df, balance, engine = "vectorized", log_format = "frame")
+
+    assert vec_results == loop_results
+    assert vec_log == loop_log
+    pd.testing.assert_frame_equal(vec_frame, pd.DataFrame(loop_log, columns = TRADE_LOG_COLUMNS))
+
+@pytest.mark.parametrize("path", HISTORY_FILES)
+def test_streaming_strategy_matches_batch(path):
+    df = add_analysis_columns(load_historical(path))
+
+    strategy = StreamingStrategy()
+    rows = pd.DataFrame([strategy.update(price) for price in df["Price"].tolist()])
+
+    for column in rows.columns:
+        np.testing.assert_array_equal(df[column].to_numpy(dtype = float),
+                                      rows[column].to_numpy(dtype = float), err_msg = column)
@@ -0,0 +1,135 @@
+"""
+Quote fetching against a local Alpha Vantage stub:
+injected key, timeouts, HTTP errors, rate limit messages,
+a missing key and the token bucket.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+import config
+from modules import price_fetcher
+from modules.price_fetcher import (AlphaVantageProvider, CachedQuoteProvider, QuoteCache,
+    TokenBucket, get_price, get_prices)
+
+@pytest.fixture
+def stub():
+    """
+    GLOBAL_QUOTE stub: SLOW answers after 1s, ERROR with
+    HTTP 500, LIMIT with the rate limit note, others 123.45.
+    Yields (url, api keys received).
+    """
+    keys = []
+
+    class QuoteHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            symbol = query["symbol"][0]
+            keys.append(query["apikey"][0])
+
+            if symbol == "SLOW":
+                time.sleep(1)
+            if symbol == "ERROR":
+                self.send_error(500)
+                return
+
+            if symbol == "LIMIT":
+                data = {"Note": "Thank you for using Alpha Vantage! Our standard API "
+                                "call frequency is 5 calls per minute."}
+            else:
+                data = {"Global Quote": {"01. symbol": symbol, "05. price": "123.4500"}}
+
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuoteHandler)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}/query", keys
+
+    server.shutdown()
+
+@pytest.fixture
+def errors(monkeypatch):
+    logged = []
+    monkeypatch.setattr(price_fetcher, "log_error", lambda source, e: logged.append((source, str(e))))
+    return logged
+
+def test_injected_key_is_sent(stub, errors):
+    url, keys = stub
+    prices = get_prices(["AAA", "BBB"], workers = 2, limiter = TokenBucket(50, 5), url = url,
+                        api_key = "test-key")
+
+    assert prices == {"AAA": "123.4500", "BBB": "123.4500"}
+    assert keys == ["test-key", "test-key"]
+    assert errors == []
+
+def test_timeout_is_logged(stub, errors, monkeypatch):
+    url, _ = stub
+    monkeypatch.setattr(price_fetcher, "quote_timeout", 0.2)
+
+    assert get_price("SLOW", url = url, api_key = "test-key") is None
+    assert [source for source, _ in errors] == ["SLOW"]
+
+def test_http_error_is_logged(stub, errors):
+    url, _ = stub
+
+    assert get_price("ERROR", url = url, api_key = "test-key") is None
+    assert "500" in errors[0][1]
+
+def test_rate_limit_note_is_logged(stub, errors):
+    url, _ = stub
+    prices = get_prices(["AAA", "LIMIT"], workers = 2, limiter = TokenBucket(50, 5), url = url,
+                        api_key = "test-key")
+
+    assert prices == {"AAA": "123.4500", "LIMIT": None}
+    assert errors[0][0] == "LIMIT" and "call frequency" in errors[0][1]
+
+def test_missing_key_is_logged_not_raised(stub, errors, monkeypatch):
+    url, keys = stub
+
+    def no_key():
+        raise AttributeError("module 'secrets' has no attribute 'Alpha_Key'")
+
+    monkeypatch.delattr(config, "api_key", raising = False)
+    monkeypatch.setitem(config.LAZY_SETTINGS, "api_key", no_key)
+
+    provider = CachedQuoteProvider(AlphaVantageProvider(batch = False, url = url),
+                                   QuoteCache(path = None))
+
+    assert provider.get_quotes(["AAA", "BBB"]) == {"AAA": None, "BBB": None}
+    assert keys == []
+    assert "No Alpha Vantage key" in errors[0][1]
+
+def test_failed_quotes_are_not_cached(stub, errors):
+    url, _ = stub
+    provider = CachedQuoteProvider(AlphaVantageProvider(batch = False, url = url,
+                                                        api_key = "test-key"),
+                                   QuoteCache(path = None))
+
+    provider.get_quotes(["AAA", "ERROR"])
+    provider.get_quotes(["AAA", "ERROR"])
+
+    assert provider.last_fetched == {"ERROR"}
+    assert provider.cache.stats()["Hits"] == 1
+
+def test_token_bucket_limits_rate():
+    limiter = TokenBucket(rate = 20, burst = 2)
+    start = time.monotonic()
+
+    for _ in range(6):
+        limiter.acquire()
+
+    # 2 from the burst, 4 refilled at 20 per second
+    assert time.monotonic() - start >= 0.19